@@ -1,2 +0,0 @@
-import requests
-print(requests.get("https://www.google.com").status_code)
\ No newline at end of file
@@ -0,0 +1,195 @@
+# Daily climatology rollup for the seasonal recommendation path.
+#   python -m ml_model.climatology      (full rebuild)
+#
+# weather_climatology holds, per (name, day of year), the multi-year mean
+# temperature and rain probability; weather_climatology_conditions holds how
+# many days each condition was reported. Days of year are counted on a leap
+# calendar (Feb 29 = 60, Mar 1 = 61 in every year), so the same calendar
+# day always lands on the same key.
+
+import time
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+CREATE_SQL = [
+    text("""
+        CREATE TABLE IF NOT EXISTS weather_climatology (
+            name VARCHAR(100) NOT NULL,
+            doy INTEGER NOT NULL,
+            days INTEGER NOT NULL,
+            years INTEGER NOT NULL,
+            temp_mean DOUBLE,
+            rain_mean DOUBLE,
+            PRIMARY KEY (name, doy)
+        )
+    """),
+    text("""
+        CREATE TABLE IF NOT EXISTS weather_climatology_conditions (
+            name VARCHAR(100) NOT NULL,
+            doy INTEGER NOT NULL,
+            conditions VARCHAR(100) NOT NULL,
+            days INTEGER NOT NULL,
+            PRIMARY KEY (name, doy, conditions)
+        )
+    """)
+]
+
+# {where} is empty (full rebuild) or a WHERE on name and / or datetime
+HISTORY_ROWS_SQL = """
+    SELECT name, datetime, temp, conditions, precipprob
+    FROM weather_master {where}
+    UNION ALL
+    SELECT name, datetime, temp, conditions, precipprob
+    FROM weather_data {where}
+"""
+
+# First and last stored day, to list the dates a day-of-year refresh reads
+HISTORY_SPAN_SQL = """
+    SELECT MIN(datetime), MAX(datetime) FROM weather_master {where}
+    UNION ALL
+    SELECT MIN(datetime), MAX(datetime) FROM weather_data {where}
+"""
+
+
+# ================= DAY OF YEAR =================
+def leap_doy(dates):
+    """Day of year on a leap calendar for a datetime Series"""
+    shift = (~dates.dt.is_leap_year & (dates.dt.month > 2)).astype(int)
+    return dates.dt.dayofyear + shift
+
+
+def doys_between(start_date, end_date):
+    """Sorted leap-calendar days of year covered by a date range"""
+    dates = pd.Series(pd.date_range(start_date, end_date, freq="D"))
+    return sorted(set(leap_doy(dates).tolist()))
+
+
+def dates_on_doys(doys, first, last):
+    """Every date in [first, last] whose leap-calendar day of year is in doys"""
+    dates = pd.Series(pd.date_range(first, last, freq="D"))
+    return [d.date() for d in dates[leap_doy(dates).isin(doys)]]
+
+
+# ================= ROLLUP =================
+def build_rollup(rows):
+    """(stats, condition counts) frames keyed by (name, doy) from daily rows"""
+    rows = rows.copy()
+    dt = pd.to_datetime(rows["datetime"])
+    rows["doy"] = leap_doy(dt)
+    rows["year"] = dt.dt.year
+
+    stats = (
+        rows.groupby(["name", "doy"])
+        .agg(
+            days=("temp", "size"),
+            years=("year", "nunique"),
+            temp_mean=("temp", "mean"),
+            rain_mean=("precipprob", "mean")
+        )
+        .reset_index()
+    )
+    conds = (
+        rows.dropna(subset=["conditions"])
+        .groupby(["name", "doy", "conditions"])
+        .size()
+        .rename("days")
+        .reset_index()
+    )
+    return stats, conds
+
+
+def refresh_climatology(engine, names=None, dates=None):
+    """
+    Recompute the rollup rows for the given names (all when None), limited
+    to the days of year of `dates` when given. Affected keys are replaced
+    in one transaction, so re-fetching a day never double counts it.
+    """
+    started = time.perf_counter()
+
+    filters, params = [], {}
+    if names is not None:
+        names = list(names)
+        if not names:
+            return 0
+        filters.append("name IN :names")
+        params["names"] = names
+
+    if dates is not None:
+        doys = set(leap_doy(pd.Series(pd.to_datetime(list(dates)))).tolist())
+        # The same calendar days of every stored year, as plain dates the
+        # (name, datetime) index can seek to
+        span = _read(engine, HISTORY_SPAN_SQL, filters, params).dropna()
+        filters.append("datetime IN :days")
+        params["days"] = [] if span.empty else dates_on_doys(
+            doys, span.iloc[:, 0].min(), span.iloc[:, 1].max()
+        )
+
+    rows = _read(engine, HISTORY_ROWS_SQL, filters, params)
+    stats, conds = build_rollup(rows)
+
+    # Only the requested names / days are replaced
+    where, keys = "", None
+    if names is not None and dates is not None:
+        where = "WHERE name = :name AND doy = :doy"
+        keys = [{"name": n, "doy": d} for n in names for d in doys]
+    elif names is not None:
+        where = "WHERE name = :name"
+        keys = [{"name": n} for n in names]
+    elif dates is not None:
+        where = "WHERE doy = :doy"
+        keys = [{"doy": d} for d in doys]
+
+    with engine.begin() as conn:
+        for ddl in CREATE_SQL:
+            conn.execute(ddl)
+
+        for table in ("weather_climatology", "weather_climatology_conditions"):
+            if keys is None:
+                conn.execute(text(f"DELETE FROM {table}"))
+            elif keys:
+                conn.execute(text(f"DELETE FROM {table} {where}"), keys)
+
+        if not stats.empty:
+            conn.execute(
+                text("""
+                    INSERT INTO weather_climatology
+                    (name, doy, days, years, temp_mean, rain_mean)
+                    VALUES (:name, :doy, :days, :years, :temp_mean, :rain_mean)
+                """),
+                _records(stats)
+            )
+        if not conds.empty:
+            conn.execute(
+                text("""
+                    INSERT INTO weather_climatology_conditions
+                    (name, doy, conditions, days)
+                    VALUES (:name, :doy, :conditions, :days)
+                """),
+                _records(conds)
+            )
+
+    print(
+        f"Climatology refreshed: {len(stats)} day rows, {len(conds)} condition rows "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return len(stats)
+
+
+def _read(engine, sql, filters, params):
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    query = text(sql.format(where=where)).bindparams(*[
+        bindparam(k, expanding=True) for k in params
+    ])
+    return pd.read_sql(query, engine, params=params)
+
+
+def _records(df):
+    """Plain Python values for the DB driver (NaN becomes NULL)"""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+if __name__ == "__main__":
+    from ml_model.db import get_engine
+
+    refresh_climatology(get_engine())
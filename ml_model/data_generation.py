@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+# -------------------------------
+# DATA GENERATION COUNTER
+# -------------------------------
+# A single-row table that every job writing weather data bumps when it
+# finishes. Readers holding derived results (caches, in-memory indexes)
+# compare generations to know when to drop them.
+
+CREATE_SQL = text("""
+    CREATE TABLE IF NOT EXISTS data_generation (
+        id INTEGER PRIMARY KEY,
+        generation BIGINT NOT NULL,
+        source VARCHAR(64),
+        updated_at VARCHAR(32)
+    )
+""")
+
+READ_SQL = text("SELECT generation FROM data_generation WHERE id = 1")
+
+
+def current_generation(engine):
+    """Current generation, 0 if nothing has been bumped yet"""
+    # Only a missing table means "never bumped"; any other error is real
+    if not inspect(engine).has_table("data_generation"):
+        return 0
+    with engine.connect() as conn:
+        value = conn.execute(READ_SQL).scalar()
+    return int(value or 0)
+
+
+def bump_generation(engine, source):
+    """Mark the weather data as changed; returns the new generation"""
+    params = {
+        "source": source,
+        "updated_at": datetime.now().isoformat(timespec="seconds")
+    }
+    with engine.begin() as conn:
+        conn.execute(CREATE_SQL)
+        updated = conn.execute(
+            text("""
+                UPDATE data_generation
+                SET generation = generation + 1,
+                    source = :source,
+                    updated_at = :updated_at
+                WHERE id = 1
+            """),
+            params
+        ).rowcount
+        if not updated:
+            conn.execute(
+                text("""
+                    INSERT INTO data_generation (id, generation, source, updated_at)
+                    VALUES (1, 1, :source, :updated_at)
+                """),
+                params
+            )
+        generation = conn.execute(READ_SQL).scalar()
+
+    print(f"Data generation {generation} ({source})")
+    return int(generation)
@@ -1,39 +1,65 @@
 import math
 import time
-import json
 import os
+from functools import lru_cache
+
+import numpy as np
 import requests
+from sklearn.neighbors import BallTree
+
+from ml_model.geo_store import GeoCacheStore
 
 # -------------------------------
-# FILE-BASED CACHE CONFIG
+# CACHE CONFIG
 # -------------------------------
+# The JSON file is only read once, to seed an empty SQLite store
 CACHE_FILE = os.path.join(os.path.dirname(__file__), "geo_cache.json")
+CACHE_DB = os.path.join(os.path.dirname(__file__), "geo_cache.sqlite3")
 
-# Load cache from file if exists
-if os.path.exists(CACHE_FILE):
-    try:
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            _GEO_CACHE = json.load(f)
-            # keys are strings, values are [lat, lon]
-    except Exception:
-        _GEO_CACHE = {}
-else:
-    _GEO_CACHE = {}
+_GEO_CACHE = GeoCacheStore(CACHE_DB, seed_json=CACHE_FILE)
 
 
-def _save_cache():
-    """Save cache to file"""
-    try:
-        with open(CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(_GEO_CACHE, f, indent=2)
-    except Exception as e:
-        print("Failed to save geo cache:", e)
+# -------------------------------
+# GEOCODER CONFIG
+# -------------------------------
+NOMINATIM_URL = os.environ.get(
+    "NOMINATIM_URL", "https://nominatim.openstreetmap.org/search"
+)
+HEADERS = {
+    # Better User-Agent to reduce blocking
+    "User-Agent": "SameerWeatherProject/1.0 (contact: choudharysameerg@gmail.com.com)"
+}
+
+# With GEOCODE_OFFLINE=1 (e.g. after running ml_model.geocode_warmup), cache
+# misses return None instead of calling the API on the request path
+GEOCODE_OFFLINE = os.environ.get("GEOCODE_OFFLINE") == "1"
+
+
+def geocode(place_name, session=None, url=None, timeout=20):
+    """
+    One Nominatim lookup: (lat, lon), or None if the place is unknown.
+    HTTP errors and timeouts raise, so callers can decide to retry.
+    """
+    http = session or requests
+    params = {
+        "q": place_name,
+        "format": "json",
+        "limit": 1
+    }
+
+    r = http.get(url or NOMINATIM_URL, params=params, headers=HEADERS, timeout=timeout)
+    r.raise_for_status()
+
+    data = r.json()
+    if not data:
+        return None
+    return float(data[0]["lat"]), float(data[0]["lon"])
 
 
 def get_coordinates(place_name):
     """
     Fetch latitude & longitude for a place using OpenStreetMap Nominatim API
-    Uses file-based cache to avoid repeated API calls.
+    Uses the SQLite-backed cache to avoid repeated API calls.
     """
     if not place_name:
         return None
@@ -41,49 +67,34 @@ def get_coordinates(place_name):
     key = place_name.lower().strip()
 
     # 1️⃣ Check cache first
-    if key in _GEO_CACHE:
-        lat, lon = _GEO_CACHE[key]
-        return float(lat), float(lon)
+    cached = _GEO_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if GEOCODE_OFFLINE:
+        return None
 
     # 2️⃣ Call API if not in cache
     try:
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            "q": place_name,
-            "format": "json",
-            "limit": 1
-        }
-        headers = {
-            # Better User-Agent to reduce blocking
-            "User-Agent": "SameerWeatherProject/1.0 (contact: choudharysameerg@gmail.com.com)"
-        }
-
-        r = requests.get(url, params=params, headers=headers, timeout=20)
-
-        if r.status_code != 200:
-            print(f"Geocoding HTTP error: {r.status_code} {place_name}")
-            return None
-
-        data = r.json()
-        if not data:
-            print("No geocoding result for", place_name)
-            return None
-
-        lat = float(data[0]["lat"])
-        lon = float(data[0]["lon"])
+        found = geocode(place_name)
+    except requests.HTTPError as e:
+        print(f"Geocoding HTTP error: {e.response.status_code} {place_name}")
+        return None
+    except Exception as e:
+        print("Geocoding error for", place_name, e)
+        return None
 
-        # 3️⃣ Save to cache (memory + file)
-        _GEO_CACHE[key] = [lat, lon]
-        _save_cache()
+    if found is None:
+        print("No geocoding result for", place_name)
+        return None
 
-        # Respect free API rate limit (important!)
-        time.sleep(0.2)
+    # 3️⃣ Save to cache (memory now, SQLite in batches)
+    _GEO_CACHE.put(key, *found)
 
-        return lat, lon
+    # Respect free API rate limit (important!)
+    time.sleep(0.2)
 
-    except Exception as e:
-        print("Geocoding error for", place_name, e)
-        return None
+    return found
 
 
 def haversine(lat1, lon1, lat2, lon2):
@@ -116,4 +127,150 @@ def distance_between(place_a, place_b):
     lat1, lon1 = coords_a
     lat2, lon2 = coords_b
 
-    return round(haversine(lat1, lon1, lat2, lon2), 1)
\ No newline at end of file
+    return round(haversine(lat1, lon1, lat2, lon2), 1)
+
+
+# -------------------------------
+# VECTORIZED DISTANCES
+# -------------------------------
+def haversine_np(lat1, lon1, lat2, lon2):
+    """
+    Same formula as haversine() on NumPy arrays; arguments broadcast, so one
+    origin against N places or (N, 1) against (1, M) both work.
+    """
+    R = 6371.0  # Earth radius in km
+
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = np.radians(np.subtract(lat2, lat1))
+    dlambda = np.radians(np.subtract(lon2, lon1))
+
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c
+
+
+def coordinate_array(place_names):
+    """
+    (N, 2) array of [lat, lon] in the order of place_names, NaN where a
+    place could not be geocoded
+    """
+    coords = np.full((len(place_names), 2), np.nan)
+    for i, name in enumerate(place_names):
+        found = get_coordinates(name)
+        if found is not None:
+            coords[i] = found
+    return coords
+
+
+def distance_matrix(coords_a, coords_b=None):
+    """
+    Pairwise distances in KM between two (N, 2) and (M, 2) coordinate
+    arrays as an (N, M) matrix; coords_b defaults to coords_a
+    """
+    if coords_b is None:
+        coords_b = coords_a
+    return haversine_np(
+        coords_a[:, 0:1], coords_a[:, 1:2],
+        coords_b[:, 0][None, :], coords_b[:, 1][None, :]
+    )
+
+
+# Seconds before places that could not be geocoded are looked up again
+# (a transient Nominatim failure, or a warm-up run since)
+MISSING_RETRY_SECONDS = 600
+
+
+class PlaceIndex:
+    """
+    Place names with their coordinates precomputed into one array, so
+    distances are array lookups by position instead of per-pair geocoding
+    """
+
+    def __init__(self, place_names):
+        self.names = list(place_names)
+        self.position = {name: i for i, name in enumerate(self.names)}
+        self.coords = coordinate_array(self.names)
+        # (rows with coordinates, BallTree over them or None if no rows)
+        self._tree = None
+        self._retry_at = time.monotonic() + MISSING_RETRY_SECONDS
+
+    def fill_missing(self):
+        """
+        Geocode the places still without coordinates again, at most every
+        MISSING_RETRY_SECONDS; the radius tree is rebuilt if any are found
+        """
+        if time.monotonic() < self._retry_at:
+            return
+        self._retry_at = time.monotonic() + MISSING_RETRY_SECONDS
+
+        missing = np.flatnonzero(np.isnan(self.coords[:, 0]))
+        if len(missing) == 0:
+            return
+        found = coordinate_array([self.names[i] for i in missing])
+        if np.isnan(found[:, 0]).all():
+            return
+
+        # Swapped whole, so readers see the old or the new array
+        coords = self.coords.copy()
+        coords[missing] = found
+        self.coords = coords
+        self._tree = None
+
+    def distances_from(self, origin):
+        """
+        Distance in KM (rounded like distance_between) from the origin place
+        to every indexed place; all NaN if the origin cannot be geocoded
+        """
+        found = get_coordinates(origin)
+        if found is None:
+            return np.full(len(self.names), np.nan)
+
+        lat, lon = found
+        return np.round(haversine_np(lat, lon, self.coords[:, 0], self.coords[:, 1]), 1)
+
+    def matrix(self):
+        """Full N x N distance matrix between the indexed places"""
+        return distance_matrix(self.coords)
+
+    def within_radius(self, origin, radius_km):
+        """
+        Names of the indexed places within radius_km of the origin place,
+        from a haversine BallTree built on first use; [] if the origin
+        cannot be geocoded
+        """
+        found = get_coordinates(origin)
+        if found is None:
+            return []
+
+        if self._tree is None:
+            coords = self.coords
+            rows = np.flatnonzero(~np.isnan(coords[:, 0]))
+            # BallTree refuses an empty array (no place geocoded yet)
+            tree = BallTree(np.radians(coords[rows]), metric="haversine") if len(rows) else None
+            self._tree = (rows, tree)
+
+        rows, tree = self._tree
+        if tree is None:
+            return []
+
+        hits = tree.query_radius(
+            np.radians([found]), r=radius_km / 6371.0
+        )[0]
+        return [self.names[i] for i in rows[np.sort(hits)]]
+
+
+@lru_cache(maxsize=32)
+def _place_index(place_names):
+    return PlaceIndex(place_names)
+
+
+def place_index(place_names):
+    """
+    Shared PlaceIndex for a tuple of place names, with the places that
+    could not be geocoded retried now and then
+    """
+    index = _place_index(place_names)
+    index.fill_missing()
+    return index
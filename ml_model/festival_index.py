@@ -0,0 +1,119 @@
+import threading
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+
+import pandas as pd
+from sqlalchemy import text
+
+from ml_model.places import normalize_place
+
+# -------------------------------
+# FESTIVAL INDEX
+# -------------------------------
+# The festivals table is read once into date-sorted arrays with the place
+# lists already normalized; a date range is two binary searches. A
+# checksum of the table's content tells when it has changed and needs
+# reloading.
+
+FESTIVALS_SQL = text("""
+    SELECT festival_name, festival_date, recommended_places
+    FROM festivals
+""")
+
+# Row count and a CRC32 of every row computed by MySQL, so only two
+# numbers come back. Other databases have no CRC32: there the rows are
+# read (the table is small) and checksummed by table_checksum.
+SIGNATURE_SQL = text("""
+    SELECT
+        COUNT(*),
+        SUM(CRC32(CONCAT_WS('|',
+            COALESCE(festival_name, ''),
+            COALESCE(festival_date, ''),
+            COALESCE(recommended_places, '')
+        )))
+    FROM festivals
+""")
+
+# How often the signature is re-checked
+FESTIVAL_CHECK_SECONDS = 60
+
+
+def table_checksum(df):
+    """(rows, CRC32 of the rows as text): changes with any edit of any value"""
+    return len(df), zlib.crc32(df.to_csv(index=False).encode("utf-8"))
+
+
+class FestivalIndex:
+    """Festivals sorted by date, answering place -> festival names for a range"""
+
+    def __init__(self, check_seconds=FESTIVAL_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._index = ([], [])
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, engine, df=None):
+        if df is None:
+            df = pd.read_sql(FESTIVALS_SQL, engine)
+        df["festival_date"] = pd.to_datetime(df["festival_date"]).dt.date
+        df = df.dropna(subset=["festival_date"])
+
+        rows = []
+        for table_pos, (name, day, places) in enumerate(
+            df[["festival_name", "festival_date", "recommended_places"]].itertuples(index=False)
+        ):
+            keys = tuple(
+                normalize_place(p) for p in str(places or "").split(",") if p.strip()
+            )
+            rows.append((day, table_pos, name, keys))
+        rows.sort(key=lambda r: r[0])
+
+        self._index = ([r[0] for r in rows], [r[1:] for r in rows])
+        print(f"Festival index loaded: {len(rows)} festivals")
+
+    def refresh(self, engine, force=False):
+        """
+        Reload if the table changed, checked at most every check_seconds;
+        returns the (dates, rows) index
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._signature is not None and now - self._checked < self.check_seconds:
+                return self._index
+            df = None
+            with engine.connect() as conn:
+                if engine.dialect.name == "mysql":
+                    signature = tuple(conn.execute(SIGNATURE_SQL).one())
+                else:
+                    df = pd.read_sql(FESTIVALS_SQL, conn)
+                    signature = table_checksum(df)
+            if force or signature != self._signature:
+                self._load(engine, df)
+                self._signature = signature
+            self._checked = now
+            return self._index
+
+    def signature(self, engine):
+        """Checksum of the table the index was built from, refreshed like the index"""
+        self.refresh(engine)
+        return self._signature
+
+    def expire(self):
+        """Re-check the signature on the next lookup"""
+        self._checked = 0.0
+        self._signature = None
+
+    def festival_map(self, engine, start_date, end_date):
+        """{normalized place: [festival names]} for festivals in the date range"""
+        dates, rows = self.refresh(engine)
+        lo = bisect_left(dates, start_date)
+        hi = bisect_right(dates, end_date)
+
+        festival_map = {}
+        # Table order, as the festivals came back from the old range query
+        for _, name, keys in sorted(rows[lo:hi]):
+            for place in keys:
+                festival_map.setdefault(place, []).append(name)
+        return festival_map
@@ -0,0 +1,205 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# -------------------------------
+# SQLITE GEOCODE STORE
+# -------------------------------
+# Replaces the rewrite-the-whole-JSON-file cache: lookups are indexed point
+# queries, new entries are buffered and upserted in batches, and WAL mode
+# lets several processes (Streamlit sessions, batch jobs) read while one
+# writes. A damaged database file is moved aside, never overwritten,
+# whether the damage shows when it is opened or on a later read or write.
+
+
+class GeoCacheStore:
+    """
+    Dict-like geocode cache ("name,in" -> (lat, lon)) backed by SQLite.
+    Keys are loaded on first use, not at import; writes are deferred until
+    flush_every entries are pending, flush() is called or the process exits.
+    """
+
+    def __init__(self, path, seed_json=None, flush_every=16):
+        self.path = path
+        self.seed_json = seed_json
+        self.flush_every = flush_every
+
+        self._memory = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Bumped when the file is moved aside; older connections reopen
+        self._epoch = 0
+
+        atexit.register(self.flush)
+
+    # ---------- connections ----------
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.epoch != self._epoch:
+            conn.close()
+            conn = None
+        if conn is None:
+            epoch = self._epoch
+            try:
+                conn = self._open()
+            except sqlite3.DatabaseError as e:
+                self._discard(e, epoch)
+                conn = self._open()
+            self._local.conn = conn
+            self._local.epoch = self._epoch
+        return conn
+
+    def _discard(self, error, epoch):
+        """Move the damaged file aside, once, however many threads hit it"""
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            print("Geo cache database unreadable, moving it aside:", error)
+            self._quarantine()
+            self._epoch += 1
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS geo_cache (
+                key TEXT PRIMARY KEY,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL
+            )
+        """)
+        if conn.execute("SELECT 1 FROM geo_cache LIMIT 1").fetchone() is None:
+            self._seed(conn)
+        return conn
+
+    def _quarantine(self):
+        stamp = int(time.time())
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.replace(self.path + suffix, f"{self.path}.corrupt-{stamp}{suffix}")
+            except OSError:
+                pass
+
+    def _seed(self, conn):
+        """Import the legacy JSON cache into an empty store (read-only use of the file)"""
+        if not self.seed_json or not os.path.exists(self.seed_json):
+            return
+        try:
+            with open(self.seed_json, "r", encoding="utf-8") as f:
+                seed = json.load(f)
+        except Exception as e:
+            print("Skipping unreadable geo cache seed:", e)
+            return
+
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO geo_cache (key, lat, lon) VALUES (?, ?, ?)",
+                [(k, float(v[0]), float(v[1])) for k, v in seed.items()]
+            )
+
+    # ---------- dict-like access ----------
+    def get(self, key, default=None):
+        found = self._memory.get(key)
+        if found is not None:
+            return found
+
+        with self._lock:
+            found = self._pending.get(key)
+        if found is None:
+            conn = self._connect()
+            epoch = self._local.epoch
+            try:
+                row = conn.execute(
+                    "SELECT lat, lon FROM geo_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.DatabaseError as e:
+                # Corruption found after open: a miss, the place is geocoded again
+                if _is_corrupt(e):
+                    self._discard(e, epoch)
+                else:
+                    print("Geo cache lookup failed:", e)
+                return default
+            if row is None:
+                return default
+            found = (float(row[0]), float(row[1]))
+
+        self._memory[key] = found
+        return found
+
+    def get_many(self, keys):
+        """{key: (lat, lon)} for the keys that are cached"""
+        return {k: v for k, v in ((k, self.get(k)) for k in keys) if v is not None}
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        found = self.get(key)
+        if found is None:
+            raise KeyError(key)
+        return found
+
+    def __setitem__(self, key, value):
+        self.put(key, value[0], value[1])
+
+    def __len__(self):
+        self.flush()
+        return self._connect().execute("SELECT COUNT(*) FROM geo_cache").fetchone()[0]
+
+    def keys(self):
+        self.flush()
+        return [r[0] for r in self._connect().execute("SELECT key FROM geo_cache")]
+
+    # ---------- writes ----------
+    def put(self, key, lat, lon):
+        value = (float(lat), float(lon))
+        self._memory[key] = value
+        with self._lock:
+            self._pending[key] = value
+            due = len(self._pending) >= self.flush_every
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Upsert every pending entry in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        try:
+            self._write(pending)
+            return
+        except sqlite3.Error as e:
+            error = e
+            if _is_corrupt(e):
+                # Start a fresh file and write there instead
+                self._discard(e, getattr(self._local, "epoch", self._epoch))
+                try:
+                    self._write(pending)
+                    return
+                except sqlite3.Error as retry_error:
+                    error = retry_error
+
+        print("Failed to save geo cache:", error)
+        with self._lock:
+            # Keep the entries for the next attempt, newer values win
+            pending.update(self._pending)
+            self._pending = pending
+
+    def _write(self, pending):
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO geo_cache (key, lat, lon) VALUES (?, ?, ?)",
+                [(k, lat, lon) for k, (lat, lon) in pending.items()]
+            )
+
+
+def _is_corrupt(error):
+    """A damaged file, not a busy or unavailable one (OperationalError)"""
+    return isinstance(error, sqlite3.DatabaseError) and not isinstance(error, sqlite3.OperationalError)
@@ -0,0 +1,153 @@
+# Offline geocode cache warm-up:
+#   python -m ml_model.geocode_warmup [--rate 1] [--workers 2] [--url http://localhost:8080/search]
+#
+# Collects every place name the app can ask about and geocodes the cache
+# misses up front, so recommendation requests only read the cache.
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import text
+
+from ml_model import distance_api
+from ml_model.rate_limit import RETRY_STATUS, TokenBucket, backoff_seconds
+from ml_model.db import get_engine
+from ml_model.places import normalize_place
+
+# Nominatim's usage policy allows one request per second
+DEFAULT_RATE = 1.0
+DEFAULT_WORKERS = 2
+DEFAULT_RETRIES = 3
+
+NAME_TABLES = ("weather_master", "weather_data", "weather_predictions")
+
+NAMES_SQL = "SELECT DISTINCT name FROM {table}"
+FESTIVAL_PLACES_SQL = "SELECT DISTINCT recommended_places FROM festivals"
+
+
+# ================= COLLECT NAMES =================
+def collect_place_names():
+    """Normalized names from every weather table and all festival place lists"""
+    names = set()
+
+    for table in NAME_TABLES:
+        df = pd.read_sql(text(NAMES_SQL.format(table=table)), get_engine())
+        names.update(normalize_place(n) for n in df["name"] if n)
+
+    fest_df = pd.read_sql(
+        text(FESTIVAL_PLACES_SQL), get_engine()
+    )
+    for places in fest_df["recommended_places"].dropna():
+        names.update(normalize_place(p) for p in str(places).split(",") if p.strip())
+
+    names.discard(None)
+    return sorted(names)
+
+
+# ================= FETCH =================
+def make_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_with_retries(place, session, bucket, url=None, retries=DEFAULT_RETRIES):
+    """
+    Geocode one place through the shared bucket, retrying like the
+    ingestion fetcher (ml_model.rate_limit)
+    """
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            return distance_api.geocode(place, session=session, url=url)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in RETRY_STATUS:
+                raise
+            if attempt == retries:
+                raise
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        time.sleep(backoff_seconds(attempt))
+
+
+def warm_up(names, rate=DEFAULT_RATE, workers=DEFAULT_WORKERS,
+            retries=DEFAULT_RETRIES, url=None):
+    """
+    Geocode every name missing from the cache through one shared session.
+    Returns counts of cached, resolved, not found and failed names.
+    """
+    cache = distance_api._GEO_CACHE
+    misses = [n for n in names if n.lower().strip() not in cache]
+    stats = {
+        "cached": len(names) - len(misses),
+        "resolved": 0,
+        "not_found": 0,
+        "failed": 0
+    }
+    print(f"{len(names)} places, {len(misses)} to geocode")
+    if not misses:
+        return stats
+
+    bucket = TokenBucket(rate)
+    session = make_session(workers)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(fetch_with_retries, name, session, bucket, url, retries): name
+            for name in misses
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            try:
+                found = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"[{done}/{len(misses)}] FAILED {name}: {e}")
+                continue
+
+            if found is None:
+                stats["not_found"] += 1
+                print(f"[{done}/{len(misses)}] No result for {name}")
+                continue
+
+            cache.put(name.lower().strip(), *found)
+            stats["resolved"] += 1
+            print(f"[{done}/{len(misses)}] {name}: {found[0]:.4f}, {found[1]:.4f}")
+
+    cache.flush()
+    return stats
+
+
+# ================= MAIN =================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-fill the geocode cache")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="requests per second across all workers")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--url", default=None,
+                        help="geocoder search URL (defaults to NOMINATIM_URL)")
+    args = parser.parse_args(argv)
+
+    stats = warm_up(
+        collect_place_names(),
+        rate=args.rate,
+        workers=args.workers,
+        retries=args.retries,
+        url=args.url
+    )
+    print(
+        f"\nGeocode warm-up done: {stats['cached']} cached, {stats['resolved']} resolved, "
+        f"{stats['not_found']} not found, {stats['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Raw API response archive.
+#
+# Every timeline response is kept as one JSON line in gzip files laid out as
+#   raw_archive/<table>/date=<fetch date>/<run>.jsonl.gz
+# One file per run and fetch date, so concurrent runs never share a file.
+# ml_model.ingestion.replay rebuilds the weather tables from it.
+
+import glob
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime
+
+from ml_model.ingestion.config import PROJECT_ROOT
+
+ARCHIVE_DIR = os.environ.get("WEATHER_ARCHIVE_DIR", os.path.join(PROJECT_ROOT, "raw_archive"))
+
+# WEATHER_ARCHIVE=0 turns archiving off
+ARCHIVE_ENABLED = os.environ.get("WEATHER_ARCHIVE", "1") != "0"
+
+
+class RawArchive:
+    """
+    Append-only writer for one table's responses; use as a context manager.
+    With enabled=False every call is a no-op.
+    """
+
+    def __init__(self, table, archive_dir=ARCHIVE_DIR, enabled=ARCHIVE_ENABLED):
+        self.table = table
+        self.archive_dir = archive_dir
+        self.enabled = enabled
+        self.run = f"{datetime.now():%H%M%S}-{os.getpid()}"
+        self.responses = 0
+        self._files = {}
+
+    def _file(self, day):
+        f = self._files.get(day)
+        if f is None:
+            folder = os.path.join(self.archive_dir, self.table, f"date={day}")
+            os.makedirs(folder, exist_ok=True)
+            f = gzip.open(os.path.join(folder, f"{self.run}.jsonl.gz"), "at", encoding="utf-8")
+            self._files[day] = f
+        return f
+
+    def write(self, name, start, end, response):
+        if not self.enabled:
+            return
+        now = datetime.now()
+        record = {
+            "name": name,
+            "start": str(start),
+            "end": str(end),
+            "fetched_at": now.isoformat(timespec="seconds"),
+            "response": response
+        }
+        self._file(now.date().isoformat()).write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.responses += 1
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        if self.responses:
+            print(f"Archived {self.responses} raw responses for {self.table}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def archive_files(table, since=None, until=None, archive_dir=ARCHIVE_DIR):
+    """Archive files of a table, oldest fetch date first, within [since, until]"""
+    files = []
+    for folder in sorted(glob.glob(os.path.join(archive_dir, table, "date=*"))):
+        day = os.path.basename(folder)[len("date="):]
+        if since and day < str(since):
+            continue
+        if until and day > str(until):
+            continue
+        files.extend(sorted(glob.glob(os.path.join(folder, "*.jsonl.gz"))))
+    return files
+
+
+def read_archive(path, damaged=None):
+    """
+    Records of one archive file. A run killed mid-write leaves a truncated
+    or corrupt gzip stream; the complete lines before the damage are still
+    returned, the rest of the file is skipped and the path is appended to
+    `damaged` if given.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"Skipping damaged line in {path}")
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            print(f"Archive file {path} is damaged ({e}); keeping the lines before it")
+            if damaged is not None:
+                damaged.append(path)
@@ -0,0 +1,245 @@
+# Resumable historical backfill:
+#   python -m ml_model.ingestion.backfill cities --start 2023-01-01 [--end 2025-12-31]
+#
+# The (locations x date range) job is split into windows of WINDOW_DAYS
+# that are fetched concurrently. Rows are upserted as windows complete and
+# every committed window is appended to a JSON-lines state file, so a rerun
+# after an interruption skips the days already stored.
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from ml_model.climatology import refresh_climatology
+from ml_model.data_generation import bump_generation
+from ml_model.db import connect, database_url
+from ml_model.ingestion.archive import RawArchive
+from ml_model.ingestion.config import (
+    CREDENTIALS_FILE, FETCH_BURST, FETCH_RATE, FETCH_RETRIES, FETCH_TIMEOUT,
+    PROJECT_ROOT, VISUAL_CROSSING_URL, load_credentials
+)
+from ml_model.ingestion.fetcher import (
+    FETCH_ERRORS, HostLimiter, describe_error, fetch_json, open_session,
+    timeline_params, timeline_url
+)
+from ml_model.ingestion.mapping import COLUMNS, map_response
+from ml_model.ingestion.targets import TARGETS
+from ml_model.ingestion.writer import WRITE_CHUNKSIZE, upsert_rows
+
+# Days per request
+WINDOW_DAYS = 30
+
+# Requests in flight; lower than the daily fetch so a long backfill leaves
+# API quota for it
+BACKFILL_CONCURRENCY = 8
+
+STATE_DIR = os.path.join(PROJECT_ROOT, "backfill_state")
+
+
+# ================= WINDOWS =================
+def date_windows(start, end, days=WINDOW_DAYS):
+    """Consecutive (start, end) windows of at most `days` days covering the range"""
+    windows = []
+    while start <= end:
+        stop = min(start + timedelta(days=days - 1), end)
+        windows.append((start, stop))
+        start = stop + timedelta(days=1)
+    return windows
+
+
+class BackfillState:
+    """
+    Days already stored per location, read from and appended to a
+    JSON-lines file. Tracking days rather than windows lets a rerun with
+    another window size still skip finished work.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut short by an interrupted run
+                    continue
+                self._mark(
+                    entry["name"],
+                    date.fromisoformat(entry["start"]),
+                    date.fromisoformat(entry["end"])
+                )
+
+    def _mark(self, name, start, end):
+        self.done.setdefault(name, set()).update(
+            range(start.toordinal(), end.toordinal() + 1)
+        )
+
+    def is_done(self, name, start, end):
+        days = self.done.get(name, ())
+        return all(d in days for d in range(start.toordinal(), end.toordinal() + 1))
+
+    def record(self, windows):
+        """Append committed (name, start, end, rows) windows"""
+        if not windows:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            for name, start, end, rows in windows:
+                f.write(json.dumps({
+                    "name": name,
+                    "start": start.isoformat(),
+                    "end": end.isoformat(),
+                    "rows": rows,
+                    "at": datetime.now().isoformat(timespec="seconds")
+                }) + "\n")
+                self._mark(name, start, end)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# ================= RUN =================
+async def run_backfill(engine, table, jobs, state, api_key,
+                       base_url=VISUAL_CROSSING_URL,
+                       concurrency=BACKFILL_CONCURRENCY, rate=FETCH_RATE,
+                       burst=FETCH_BURST, retries=FETCH_RETRIES,
+                       timeout=FETCH_TIMEOUT, chunksize=WRITE_CHUNKSIZE,
+                       archive=None):
+    """
+    Fetch every (name, start, end) job window and upsert its rows into
+    `table`, keeping each response in `archive` (a RawArchive) if given.
+    Fetched windows wait in a bounded queue for one writer, which commits
+    about `chunksize` rows at a time and then checkpoints them.
+    Returns counts of windows and rows stored and windows failed.
+    """
+    params = timeline_params(api_key)
+    limiter = HostLimiter(rate, burst)
+    semaphore = asyncio.Semaphore(concurrency)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    stats = {"windows": 0, "rows": 0, "failed": 0}
+
+    async def fetch_window(session, name, start, end):
+        async with semaphore:
+            url = timeline_url(base_url, name, start, end)
+            try:
+                data = await fetch_json(session, url, params, limiter, retries)
+                rows = map_response(name, data)
+            except FETCH_ERRORS + (KeyError,) as e:
+                stats["failed"] += 1
+                print(f"FAILED {name} {start}..{end}: {describe_error(e)}")
+                return
+            if archive is not None:
+                archive.write(name, start, end, data)
+        await queue.put((name, start, end, rows))
+
+    async def produce(session):
+        await asyncio.gather(*(fetch_window(session, *job) for job in jobs))
+        await queue.put(None)
+
+    async def write():
+        rows, windows = [], []
+
+        async def flush():
+            if rows:
+                await asyncio.to_thread(upsert_rows, engine, table, COLUMNS, list(rows), chunksize)
+            state.record(windows)
+            stats["windows"] += len(windows)
+            stats["rows"] += len(rows)
+            print(f"[{stats['windows']}/{len(jobs)}] windows stored")
+            rows.clear()
+            windows.clear()
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            name, start, end, window_rows = item
+            rows.extend(window_rows)
+            windows.append((name, start, end, len(window_rows)))
+            if len(rows) >= chunksize:
+                await flush()
+        if windows:
+            await flush()
+
+    async with open_session(concurrency, timeout) as session:
+        await asyncio.gather(write(), produce(session))
+    return stats
+
+
+def plan_jobs(names, start, end, state, window_days=WINDOW_DAYS):
+    """(name, start, end) windows not yet fully recorded in the state"""
+    return [
+        (name, ws, we)
+        for name in names
+        for ws, we in date_windows(start, end, window_days)
+        if not state.is_done(name, ws, we)
+    ]
+
+
+# ================= MAIN =================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill weather history")
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat,
+                        default=date.today() - timedelta(days=1))
+    parser.add_argument("--names", nargs="+", default=None,
+                        help="subset of the target's locations, e.g. \"Delhi,IN\"")
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS)
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=FETCH_RATE,
+                        help="requests per second to the API host")
+    parser.add_argument("--chunksize", type=int, default=WRITE_CHUNKSIZE)
+    parser.add_argument("--state", default=None,
+                        help="state file (default backfill_state/<target>.jsonl)")
+    parser.add_argument("--url", default=VISUAL_CROSSING_URL)
+    parser.add_argument("--credentials", default=CREDENTIALS_FILE)
+    parser.add_argument("--db-url", default=None,
+                        help="database URL (defaults to WEATHER_DB_URL, then the MySQL credentials)")
+    args = parser.parse_args(argv)
+
+    target = TARGETS[args.target]
+    names = args.names or target["names"]
+
+    creds = load_credentials(args.credentials)
+    engine = connect(args.db_url or database_url(creds))
+    state = BackfillState(args.state or os.path.join(STATE_DIR, f"{args.target}.jsonl"))
+
+    jobs = plan_jobs(names, args.start, args.end, state, args.window_days)
+    total = len(names) * len(date_windows(args.start, args.end, args.window_days))
+    print(f"{total - len(jobs)}/{total} windows already done, {len(jobs)} to fetch")
+
+    started = time.perf_counter()
+    with RawArchive(target["table"]) as archive:
+        stats = asyncio.run(run_backfill(
+            engine, target["table"], jobs, state, creds["api_key"],
+            base_url=args.url,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            chunksize=args.chunksize,
+            archive=archive
+        ))
+    print(
+        f"\nBackfill done in {time.perf_counter() - started:.1f}s: "
+        f"{stats['windows']} windows, {stats['rows']} rows stored, "
+        f"{stats['failed']} windows failed"
+    )
+
+    if stats["windows"]:
+        refresh_climatology(engine, names=names)
+        bump_generation(engine, f"backfill_{args.target}")
+
+    if stats["failed"]:
+        print("Run the same command again to retry the failed windows")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import json
+import os
+
+# -------------------------------
+# INGESTION CONFIG
+# -------------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CREDENTIALS_FILE = os.path.join(PROJECT_ROOT, "config", "credentials.json")
+
+# Point at a local fake server for tests: VISUAL_CROSSING_URL=http://127.0.0.1:8081/timeline
+VISUAL_CROSSING_URL = os.environ.get(
+    "VISUAL_CROSSING_URL",
+    "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline"
+)
+
+# All places are requested at once (40 places take about as long as the
+# slowest response); the per-host bucket spreads anything beyond the burst
+FETCH_CONCURRENCY = 50
+FETCH_RATE = 20
+FETCH_BURST = 50
+FETCH_RETRIES = 3
+FETCH_TIMEOUT = 30
+
+
+def load_credentials(path=CREDENTIALS_FILE):
+    """config/credentials.json, found from the project root whatever the cwd"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def mysql_url(creds):
+    mysql = creds["mysql"]
+    return (
+        f"mysql+pymysql://{mysql['user']}:{mysql['password']}"
+        f"@{mysql['host']}:{mysql['port']}/{mysql['database']}"
+    )
@@ -0,0 +1,130 @@
+# Asynchronous Visual Crossing fetcher for the ingestion pipeline.
+#
+# One pooled aiohttp session, at most `concurrency` requests in flight, a
+# token bucket per host and jittered retries on timeouts, connection
+# errors and 429/5xx. A place that still fails is reported back instead of
+# raised, so every other place is stored.
+
+import asyncio
+import time
+from urllib.parse import quote, urlsplit
+
+import aiohttp
+
+from ml_model.ingestion.config import (
+    FETCH_BURST, FETCH_CONCURRENCY, FETCH_RATE, FETCH_RETRIES, FETCH_TIMEOUT,
+    VISUAL_CROSSING_URL
+)
+from ml_model.rate_limit import RETRY_STATUS, AsyncTokenBucket, backoff_seconds
+
+
+# ================= FETCH =================
+def timeline_url(base_url, place, start, end):
+    return f"{base_url.rstrip('/')}/{quote(place, safe=',')}/{start}/{end}"
+
+
+class HostLimiter:
+    """An AsyncTokenBucket per host, created on first use"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+
+    async def acquire(self, url):
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = AsyncTokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+
+
+async def fetch_json(session, url, params, limiter, retries=FETCH_RETRIES):
+    """
+    GET a JSON document, waiting for a host token before every attempt;
+    timeouts, connection errors and RETRY_STATUS responses are retried
+    """
+    for attempt in range(retries + 1):
+        await limiter.acquire(url)
+        try:
+            async with session.get(url, params=params) as res:
+                if res.status not in RETRY_STATUS or attempt == retries:
+                    res.raise_for_status()
+                    return await res.json(content_type=None)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+        await asyncio.sleep(backoff_seconds(attempt))
+
+
+def timeline_params(api_key):
+    return {
+        "unitGroup": "metric",
+        "key": api_key,
+        "include": "days",
+        "contentType": "json"
+    }
+
+
+def open_session(concurrency=FETCH_CONCURRENCY, timeout=FETCH_TIMEOUT):
+    """aiohttp session pooling up to `concurrency` connections"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+
+
+def describe_error(e):
+    """Short failure message; HTTP errors without their URL, which carries the API key"""
+    if isinstance(e, aiohttp.ClientResponseError):
+        return f"HTTP {e.status}"
+    return f"{type(e).__name__}: {e}"
+
+
+# Errors that fail one place (or window) without stopping the run
+FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ValueError)
+
+
+async def fetch_places(places, start, end, api_key, base_url=VISUAL_CROSSING_URL,
+                       concurrency=FETCH_CONCURRENCY, rate=FETCH_RATE,
+                       burst=FETCH_BURST, retries=FETCH_RETRIES,
+                       timeout=FETCH_TIMEOUT, archive=None):
+    """
+    Fetch the daily timeline of every place between start and end, keeping
+    each response in `archive` (a RawArchive) if given.
+    Returns ({place: response JSON}, {place: error message}).
+    """
+    params = timeline_params(api_key)
+    limiter = HostLimiter(rate, burst)
+    semaphore = asyncio.Semaphore(concurrency)
+    results, failures = {}, {}
+
+    async def fetch_one(session, place):
+        async with semaphore:
+            started = time.perf_counter()
+            url = timeline_url(base_url, place, start, end)
+            try:
+                results[place] = await fetch_json(session, url, params, limiter, retries)
+            except FETCH_ERRORS as e:
+                failures[place] = describe_error(e)
+                print(f"FAILED {place}: {failures[place]}")
+                return
+            if archive is not None:
+                archive.write(place, start, end, results[place])
+            print(f"Fetched {place} in {time.perf_counter() - started:.2f}s")
+
+    async with open_session(concurrency, timeout) as session:
+        await asyncio.gather(*(fetch_one(session, place) for place in places))
+
+    return results, failures
+
+
+def fetch_all(places, start, end, api_key, **kwargs):
+    """Blocking fetch_places for the scripts"""
+    started = time.perf_counter()
+    results, failures = asyncio.run(fetch_places(places, start, end, api_key, **kwargs))
+    print(
+        f"Fetched {len(results)}/{len(places)} places "
+        f"in {time.perf_counter() - started:.2f}s ({len(failures)} failed)"
+    )
+    return results, failures
@@ -0,0 +1,60 @@
+import json
+
+# -------------------------------
+# RESPONSE -> ROW MAPPING
+# -------------------------------
+# A timeline day becomes one tuple in COLUMNS order. The mapping function
+# is built once from the field lists below, so mapping a day is one pass
+# over the field names instead of building a 35-key dict.
+
+# Daily fields of weather_master / weather_data, in table order
+DAY_FIELDS = [
+    "temp", "tempmax", "tempmin",
+    "feelslike", "feelslikemax", "feelslikemin",
+    "dew", "humidity",
+    "precip", "precipprob", "precipcover", "preciptype",
+    "sealevelpressure", "severerisk",
+    "snow", "snowdepth",
+    "cloudcover", "conditions", "description", "icon",
+    "stations",
+    "solarradiation", "solarenergy", "uvindex",
+    "visibility", "winddir", "windgust", "windspeed",
+    "sunrise", "sunset", "moonphase"
+]
+
+# Lists in the API response, stored as JSON text
+JSON_FIELDS = {"preciptype", "stations"}
+
+SOURCE = "visualcrossing"
+
+COLUMNS = ["name", "datetime"] + DAY_FIELDS + ["source"]
+
+
+def to_json(v):
+    return json.dumps(v) if isinstance(v, (list, dict)) else v
+
+
+def compile_mapping(day_fields=DAY_FIELDS, json_fields=JSON_FIELDS, source=SOURCE):
+    """
+    Build map_day(name, day) -> tuple for the given fields, e.g.
+    (name, day["datetime"], day.get("temp"), ..., to_json(day.get("stations")), source)
+    """
+    fields = tuple(day_fields)
+    json_at = [i for i, field in enumerate(fields) if field in json_fields]
+
+    def map_day(name, day):
+        get = day.get
+        values = [get(field) for field in fields]
+        for i in json_at:
+            values[i] = to_json(values[i])
+        return (name, day["datetime"], *values, source)
+
+    return map_day
+
+
+map_day = compile_mapping()
+
+
+def map_response(name, data):
+    """Row tuples for every day of a timeline response"""
+    return [map_day(name, day) for day in data["days"]]
@@ -0,0 +1,142 @@
+# Ingestion pipeline shared by every target:
+#   python -m ml_model.ingestion.pipeline <places|cities> [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+#
+#   fetch -> parse -> map -> batch -> write
+#
+# Every stage is a generator over the previous one, so days stream from the
+# API responses into upsert batches without a per-place DataFrame. Live
+# fetches and the raw archive are both sources of (name, response) pairs.
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from ml_model.climatology import refresh_climatology
+from ml_model.data_generation import bump_generation
+from ml_model.db import connect, database_url
+from ml_model.ingestion.archive import RawArchive, read_archive
+from ml_model.ingestion.config import (
+    CREDENTIALS_FILE, VISUAL_CROSSING_URL, load_credentials
+)
+from ml_model.ingestion.fetcher import fetch_all
+from ml_model.ingestion.mapping import COLUMNS, map_day
+from ml_model.ingestion.targets import TARGETS
+from ml_model.ingestion.writer import WRITE_CHUNKSIZE, batched, write_batches
+
+
+# ================= SOURCES =================
+def fetch_responses(names, start, end, api_key, failures=None, **fetch_kwargs):
+    """(name, response) of every location fetched live; failures collects the rest"""
+    results, failed = fetch_all(names, start, end, api_key, **fetch_kwargs)
+    if failures is not None:
+        failures.update(failed)
+    for name in names:
+        if name in results:
+            yield name, results[name]
+
+
+def archived_responses(files, stats=None):
+    """(name, response) of every record in the archive files, in order"""
+    for path in files:
+        damaged = stats["damaged"] if stats is not None else None
+        for record in read_archive(path, damaged):
+            if stats is not None:
+                stats["responses"] += 1
+                stats["names"].add(record["name"])
+            yield record["name"], record["response"]
+
+
+# ================= STAGES =================
+def parse_days(responses):
+    """(name, day) for every day of every response"""
+    for name, data in responses:
+        for day in data["days"]:
+            yield name, day
+
+
+def map_rows(days, mapper=map_day):
+    """Row tuples in COLUMNS order"""
+    for name, day in days:
+        yield mapper(name, day)
+
+
+def timed(items, stats, key):
+    """Pass items through, adding the time spent producing them to stats[key]"""
+    items = iter(items)
+    while True:
+        started = time.perf_counter()
+        item = next(items, None)
+        stats[key] += time.perf_counter() - started
+        if item is None:
+            return
+        yield item
+
+
+def run_pipeline(engine, table, responses, chunksize=WRITE_CHUNKSIZE):
+    """Parse, map, batch and upsert responses in one transaction; returns rows written"""
+    rows = map_rows(parse_days(responses))
+    return write_batches(engine, table, COLUMNS, batched(rows, chunksize))
+
+
+# ================= JOB =================
+def ingest(target, start, end, engine, api_key, base_url=VISUAL_CROSSING_URL,
+           chunksize=WRITE_CHUNKSIZE):
+    """
+    Fetch one target's locations for [start, end] and store them, then
+    refresh their climatology and bump the data generation (both skipped
+    when nothing was stored).
+    Returns {name: error} for the locations that failed.
+    """
+    spec = TARGETS[target]
+    failures = {}
+
+    with RawArchive(spec["table"]) as archive:
+        responses = fetch_responses(
+            spec["names"], start, end, api_key, failures,
+            base_url=base_url, archive=archive
+        )
+        written = run_pipeline(engine, spec["table"], responses, chunksize)
+
+    stored = [n for n in spec["names"] if n not in failures]
+    if not stored or not written:
+        print("Nothing stored; climatology and data generation left as they are")
+        return failures
+
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    refresh_climatology(engine, names=stored, dates=days)
+    bump_generation(engine, spec["generation_source"])
+    return failures
+
+
+# ================= MAIN =================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch and store daily weather")
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--end", type=date.fromisoformat, default=None,
+                        help="last day (defaults to --start)")
+    parser.add_argument("--chunksize", type=int, default=WRITE_CHUNKSIZE)
+    parser.add_argument("--url", default=VISUAL_CROSSING_URL)
+    parser.add_argument("--credentials", default=CREDENTIALS_FILE)
+    parser.add_argument("--db-url", default=None,
+                        help="database URL (defaults to WEATHER_DB_URL, then the MySQL credentials)")
+    args = parser.parse_args(argv)
+
+    creds = load_credentials(args.credentials)
+    engine = connect(args.db_url or database_url(creds))
+
+    failures = ingest(
+        args.target, args.start, args.end or args.start, engine, creds["api_key"],
+        base_url=args.url, chunksize=args.chunksize
+    )
+
+    if failures:
+        print(f"\n{len(failures)} {args.target} failed: {', '.join(failures)}")
+        return 1
+    print(f"\nALL {args.target.upper()} STORED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+# -------------------------------
+# INGESTION TARGETS
+# -------------------------------
+# Which locations are fetched into which table. Shared by the daily fetch
+# scripts and the backfill command.
+
+PLACES = [
+    "Manali,IN", "Shimla,IN", "Auli,IN", "Gulmarg,IN", "Leh,IN",
+    "Udaipur,IN", "Mount Abu,IN", "Rishikesh,IN", "Nainital,IN", "Kutch,IN",
+    "Ooty,IN", "Coorg,IN", "Munnar,IN", "Kodaikanal,IN", "Darjeeling,IN",
+    "Mahabaleshwar,IN", "Gangtok,IN", "Shillong,IN", "Tawang,IN", "Kerala,IN",
+    "Goa,IN", "Lonavala,IN", "Cherrapunji,IN", "Wayanad,IN", "Konkan,IN",
+    "Mussoorie,IN", "Panchgani,IN", "Varanasi,IN", "Mathura,IN", "Vrindavan,IN",
+    "Agra,IN", "Amritsar,IN", "Belur Math,IN", "Ayodhya,IN", "Bodh Gaya,IN",
+    "Sarnath,IN", "Puri,IN", "Bhubaneswar,IN", "Udupi,IN", "Shantiniketan,IN",
+]
+
+CITIES = [
+    "Mumbai,IN", "Delhi,IN", "Pune,IN", "Chennai,IN", "Bengaluru,IN",
+    "Ahmedabad,IN", "Kolkata,IN", "Hyderabad,IN", "Jaipur,IN", "Lucknow,IN"
+]
+
+# generation_source is recorded with the data generation bump after a fetch
+TARGETS = {
+    "places": {"names": PLACES, "table": "weather_data", "generation_source": "fetch_places"},
+    "cities": {"names": CITIES, "table": "weather_master", "generation_source": "fetch_cities"}
+}
@@ -0,0 +1,108 @@
+# Write stage of the ingestion scripts: every fetched day goes into its
+# table through one transaction of multi-row upserts keyed on
+# (name, datetime), so readers never see a place half replaced.
+
+import time
+from itertools import islice
+
+from sqlalchemy import inspect
+
+from ml_model.schema import find_index
+
+# Rows per executemany batch; the driver sends each batch as one
+# multi-row INSERT
+WRITE_CHUNKSIZE = 500
+
+KEY_COLUMNS = ("name", "datetime")
+
+_checked_keys = set()
+
+
+# ================= UNIQUE KEY =================
+def require_unique_key(engine, table):
+    """
+    Fail unless `table` exists with the unique (name, datetime) key the
+    upsert clashes on. Tables and keys come from ml_model.migrations;
+    checked once per engine and table.
+    """
+    if (engine.url, table) in _checked_keys:
+        return
+
+    if not inspect(engine).has_table(table) or \
+            find_index(engine, table, KEY_COLUMNS, unique=True) is None:
+        raise RuntimeError(
+            f"{table} has no unique key on ({', '.join(KEY_COLUMNS)}); "
+            f"run python -m ml_model.migrations first"
+        )
+    _checked_keys.add((engine.url, table))
+
+
+# ================= UPSERT =================
+PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+
+def upsert_sql(dialect, table, columns):
+    """
+    Driver-level INSERT ... VALUES with positional placeholders that
+    updates the existing row on a (name, datetime) clash, stamping it
+    with a new fetched_at
+    """
+    names = ", ".join(columns)
+    values = ", ".join([PLACEHOLDERS[dialect.paramstyle]] * len(columns))
+    updates = [c for c in columns if c not in KEY_COLUMNS and c != "fetched_at"]
+
+    if dialect.name == "mysql":
+        sets = [f"{c} = VALUES({c})" for c in updates]
+        on_clash = "ON DUPLICATE KEY UPDATE "
+    else:
+        # SQLite and PostgreSQL
+        sets = [f"{c} = excluded.{c}" for c in updates]
+        on_clash = f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET "
+    on_clash += ", ".join(sets + ["fetched_at = CURRENT_TIMESTAMP"])
+    return f"INSERT INTO {table} ({names}) VALUES ({values}) {on_clash}"
+
+
+def batched(rows, size):
+    """Lists of up to `size` items from any iterable"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_batches(engine, table, columns, batches):
+    """
+    Upsert batches of row tuples (in `columns` order) into `table` as they
+    arrive, all in one transaction. Returns the rows written.
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+    if not first:
+        return 0
+
+    require_unique_key(engine, table)
+    sql = upsert_sql(engine.dialect, table, columns)
+
+    written = 0
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        batch = first
+        while batch:
+            conn.exec_driver_sql(sql, batch)
+            written += len(batch)
+            batch = next(batches, None)
+    elapsed = time.perf_counter() - started
+
+    rate = written / elapsed if elapsed > 0 else float("inf")
+    print(f"Upserted {written} rows into {table} in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return written
+
+
+def upsert_rows(engine, table, columns, rows, chunksize=WRITE_CHUNKSIZE):
+    """
+    Upsert a list of row tuples into `table` in one transaction, chunksize
+    rows per statement. Returns the rows written.
+    """
+    return write_batches(engine, table, columns, batched(rows, chunksize))
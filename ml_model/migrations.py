@@ -0,0 +1,408 @@
+# Versioned schema migrations and a query plan check.
+#   python -m ml_model.migrations              (apply pending migrations)
+#   python -m ml_model.migrations --status
+#   python -m ml_model.migrations --check      (EXPLAIN every registered query)
+#
+# Applied versions are recorded in schema_migrations. Every step is
+# idempotent (tables are created only when missing, indexes only when no
+# equivalent exists), so a database set up by hand or by earlier scripts
+# can be brought up to date by running all of them. Before a unique key
+# is added, rows sharing the key are reduced to the newest one.
+#
+# --check runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite, EXPLAIN (FORMAT JSON)
+# on PostgreSQL) on every query the project issues and exits non-zero when
+# one reads a table in full that INTENDED_FULL_READS does not list for it,
+# when a query constant of an ml_model module is missing from
+# registered_queries, or when a hot-path index is missing. Run it against
+# a populated database: on a near-empty table MySQL may prefer a scan to
+# any index.
+
+import argparse
+import importlib
+import json
+import pkgutil
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from ml_model import schema
+from ml_model.db import connect
+
+CREATE_SQL = text("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        description VARCHAR(200) NOT NULL,
+        applied_at VARCHAR(32)
+    )
+""")
+
+
+# ================= MIGRATIONS =================
+def create_tables(engine):
+    from ml_model import climatology, data_generation
+
+    schema.metadata.create_all(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(data_generation.CREATE_SQL)
+        for ddl in climatology.CREATE_SQL:
+            conn.execute(ddl)
+
+
+def hot_path_indexes(engine, indexes=None):
+    """Every index of `indexes` (default: all of schema.HOT_INDEXES) that is missing"""
+    for table, columns, unique in indexes or schema.HOT_INDEXES:
+        # Older tables may hold several fetches of the same key
+        if unique and schema.find_index(engine, table, columns, unique) is None:
+            schema.drop_duplicate_keys(engine, table, columns, schema.NEWEST_COLUMN.get(table))
+        schema.ensure_index(engine, table, columns, unique)
+
+
+MIGRATIONS = [
+    (1, "weather, prediction, festival, generation and climatology tables", create_tables),
+    (2, "hot-path indexes and upsert unique keys", hot_path_indexes),
+    (3, "datetime indexes of the history tables",
+     lambda engine: hot_path_indexes(engine, schema.DAY_INDEXES)),
+    (4, "fetched_at indexes of the history tables",
+     lambda engine: hot_path_indexes(engine, schema.STAMP_INDEXES))
+]
+
+
+def applied_versions(engine):
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT version FROM schema_migrations")).all()
+    except DBAPIError:
+        # Table not created yet
+        return set()
+    return {r[0] for r in rows}
+
+
+def migrate(engine):
+    """Apply pending migrations in version order; returns the versions applied"""
+    with engine.begin() as conn:
+        conn.execute(CREATE_SQL)
+    done = applied_versions(engine)
+
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if version in done:
+            continue
+        print(f"Migration {version}: {description}")
+        step(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                text("""
+                    INSERT INTO schema_migrations (version, description, applied_at)
+                    VALUES (:version, :description, :applied_at)
+                """),
+                {
+                    "version": version,
+                    "description": description,
+                    "applied_at": datetime.now().isoformat(timespec="seconds")
+                }
+            )
+        applied.append(version)
+
+    print(f"Schema at version {max(done | set(applied), default=0)}"
+          f" ({len(applied)} migration(s) applied)")
+    return applied
+
+
+# ================= QUERY REGISTRY =================
+# The only whole-table reads that are meant to happen: label -> (tables it
+# may read in full, why). A full table or full index scan anywhere else
+# fails the check.
+INTENDED_FULL_READS = {
+    "weather ranges: history rows, full load": (
+        {"weather_master", "weather_data"}, "first load of the prefix sums"
+    ),
+    "weather ranges: predictions rows": ({"weather_predictions"}, "prefix sums, rewritten per forecast"),
+    "weather ranges: seasonal rows": ({"weather_climatology"}, "prefix sums"),
+    "weather ranges: seasonal conditions": ({"weather_climatology_conditions"}, "prefix sums"),
+    "festival index": ({"festivals"}, "loaded whole into the festival index"),
+    "festival signature": ({"festivals"}, "checksum of the whole table"),
+    "climatology full rebuild": ({"weather_master", "weather_data"}, "rebuilds every place"),
+    "forecast history (weather_master)": ({"weather_master"}, "trains on every place"),
+    "forecast history (weather_data)": ({"weather_data"}, "trains on every place"),
+    "geocode warm-up festival places": ({"festivals"}, "offline warm-up job"),
+    "geocode warm-up names (weather_master)": ({"weather_master"}, "offline warm-up job"),
+    "geocode warm-up names (weather_data)": ({"weather_data"}, "offline warm-up job"),
+    "geocode warm-up names (weather_predictions)": ({"weather_predictions"}, "offline warm-up job"),
+    "recommend: known places": (
+        {"weather_master", "weather_data"}, "every place name, re-read once per PLACE_LIST_TTL"
+    )
+}
+
+# Leading keywords of the statements the plan check covers
+QUERY_KEYWORDS = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def registered_queries(city="Delhi,IN", day=None, dialect="mysql"):
+    """
+    (template, label, sql, params) for every query the project issues on a
+    `dialect` database. template is the module constant the query is built
+    from, which is how unregistered_queries tells it is covered.
+    """
+    from ml_model import climatology, data_generation, festival_index, geocode_warmup
+    from ml_model import random_forest, weather_lookup, weather_ranges
+    from ml_model import travel_recommendation_calendar as trc
+
+    day = day or date.today()
+    window = {"start": day, "end": day + timedelta(days=6)}
+    names = {"names": [city]}
+    by_name = "AND name IN :names"
+    history = trc.HISTORY_WEATHER_SQL.format(names=by_name)
+    doys = climatology.doys_between(window["start"], window["end"])
+
+    queries = [
+        (weather_lookup.lookup_sql(t), f"weather tab lookup ({t})", weather_lookup.lookup_sql(t),
+         {"city": city, "dt": day})
+        for t in weather_lookup.LOOKUP_TABLES
+    ]
+    queries += [
+        (weather_lookup.FORECAST_WINDOW_SQL, "weather tab forecast window",
+         weather_lookup.FORECAST_WINDOW_SQL, {"city": city}),
+        (weather_lookup.TEMPERATURE_TREND_SQL, "weather tab temperature trend",
+         weather_lookup.TEMPERATURE_TREND_SQL, {"city": city}),
+        (trc.HISTORY_WEATHER_SQL, "recommend: history rows", history, dict(window, **names)),
+        (trc.PREDICTED_WEATHER_SQL, "recommend: predicted rows",
+         trc.PREDICTED_WEATHER_SQL.format(names=by_name), dict(window, **names)),
+        (trc.PREDICTED_WEATHER_SQL, "recommend: predicted rows, all places",
+         trc.PREDICTED_WEATHER_SQL.format(names=""), window),
+        (trc.AGGREGATE_WEATHER_SQL, "recommend: history aggregate",
+         trc.AGGREGATE_WEATHER_SQL.format(rows=history), dict(window, **names)),
+        (trc.CLIMATOLOGY_WEATHER_SQL, "recommend: climatology",
+         trc.CLIMATOLOGY_WEATHER_SQL.format(names=by_name), dict(names, doys=doys)),
+        (trc.KNOWN_PLACES_SQL, "recommend: known places", trc.KNOWN_PLACES_SQL, {}),
+        (data_generation.READ_SQL, "data generation", data_generation.READ_SQL, {}),
+        (climatology.HISTORY_SPAN_SQL, "climatology refresh span",
+         climatology.HISTORY_SPAN_SQL.format(where="WHERE name IN :names"), names),
+        (climatology.HISTORY_ROWS_SQL, "climatology refresh rows",
+         climatology.HISTORY_ROWS_SQL.format(where="WHERE name IN :names AND datetime IN :days"),
+         dict(names, days=climatology.dates_on_doys(doys, day - timedelta(days=3 * 365), day))),
+        (climatology.HISTORY_ROWS_SQL, "climatology full rebuild",
+         climatology.HISTORY_ROWS_SQL.format(where=""), {}),
+        (random_forest.CLEAN_PREDICTIONS_SQL, "forecast: clean future predictions",
+         random_forest.CLEAN_PREDICTIONS_SQL, {"today": day}),
+        (festival_index.FESTIVALS_SQL, "festival index", festival_index.FESTIVALS_SQL, {}),
+        # Only MySQL computes the checksum; elsewhere the rows are read
+        (festival_index.SIGNATURE_SQL, "festival signature",
+         festival_index.SIGNATURE_SQL if dialect == "mysql" else festival_index.FESTIVALS_SQL, {}),
+        (geocode_warmup.FESTIVAL_PLACES_SQL, "geocode warm-up festival places",
+         geocode_warmup.FESTIVAL_PLACES_SQL, {})
+    ]
+    queries += [
+        (geocode_warmup.NAMES_SQL, f"geocode warm-up names ({t})",
+         geocode_warmup.NAMES_SQL.format(table=t), {})
+        for t in geocode_warmup.NAME_TABLES
+    ]
+    # Incremental sources re-read the last days on a refresh and every day
+    # on the first load; only the first load may read whole tables
+    since = {
+        "since": day - timedelta(days=weather_ranges.REFRESH_OVERLAP_DAYS),
+        "stamp": datetime.combine(day, datetime.min.time())
+    }
+    queries += [
+        (spec[part], f"weather ranges: {source} {part}", spec[part], since)
+        for source, spec in weather_ranges.SOURCES.items()
+        for part in ("rows", "count_before", "changed_before", "stamp", "conditions")
+        if part in spec
+    ]
+    queries += [
+        (spec["rows"], f"weather ranges: {source} rows, full load", spec["rows"],
+         {"since": weather_ranges.FULL_LOAD_SINCE})
+        for source, spec in weather_ranges.SOURCES.items() if spec["incremental"]
+    ]
+    queries += [
+        (sql, f"forecast history ({t})", sql, {})
+        for t, sql in random_forest.HISTORY_SQL.items()
+    ]
+    return queries
+
+
+def _statement(sql):
+    """Whitespace-normalized text of a str or text() query"""
+    return " ".join((sql if isinstance(sql, str) else sql.text).split())
+
+
+def _query_constants(value, source):
+    """(source, statement) for each query in a module constant, dicts and lists included"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _query_constants(item, f"{source}[{key!r}]")
+    elif isinstance(value, (list, tuple)):
+        for i, item in enumerate(value):
+            yield from _query_constants(item, f"{source}[{i}]")
+    elif isinstance(value, str) or hasattr(value, "text"):
+        words = _statement(value).split(" ")
+        if len(words) > 1 and words[0].upper() in QUERY_KEYWORDS:
+            yield source, " ".join(words)
+
+
+def unregistered_queries(registered):
+    """
+    UPPERCASE constants of the ml_model modules holding a query that no
+    registered entry is built from, as "module.NAME" strings
+    """
+    import ml_model
+
+    covered = {_statement(template) for template, *_ in registered}
+    missing = []
+    for info in pkgutil.walk_packages(ml_model.__path__, "ml_model."):
+        module = importlib.import_module(info.name)
+        for attr, value in vars(module).items():
+            if not attr.isupper():
+                continue
+            for source, statement in _query_constants(value, f"{info.name}.{attr}"):
+                if statement not in covered:
+                    missing.append(source)
+    return missing
+
+
+def _explain(prefix, sql, params):
+    """EXPLAIN text() of a registered query, list parameters expanded"""
+    sql = sql if isinstance(sql, str) else sql.text
+    return text(f"{prefix} {sql}").bindparams(*[
+        bindparam(k, expanding=True)
+        for k, v in params.items() if isinstance(v, (list, tuple))
+    ])
+
+
+# ================= PLAN CHECK =================
+PLAN_DIALECTS = ("sqlite", "mysql", "postgresql")
+
+
+def _pg_scans(plan):
+    """
+    {relation: kind} for the full scans anywhere in a PostgreSQL JSON plan
+    node: Seq Scans, and index scans with no Index Cond to seek on
+    """
+    scans = {}
+    node = plan.get("Node Type")
+    if node == "Seq Scan":
+        scans[plan.get("Relation Name")] = "table"
+    elif node in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan:
+        scans.setdefault(plan.get("Relation Name"), "index")
+    for child in plan.get("Plans", []):
+        for relation, kind in _pg_scans(child).items():
+            if scans.get(relation) != "table":
+                scans[relation] = kind
+    return scans
+
+
+def full_scans(conn, dialect, sql, params, tables):
+    """
+    {base table: "table" or "index"} for the tables the query reads in
+    full, per the database's query plan. "index" is a walk over every
+    entry of an index, which reads as much as a table scan.
+    """
+    scans = {}
+    if dialect == "sqlite":
+        plan = conn.execute(_explain("EXPLAIN QUERY PLAN", sql, params), params).all()
+        for row in plan:
+            words = row[-1].split()
+            # "SCAN weather_master" (or "SCAN TABLE ..." on older SQLite),
+            # "SCAN weather_master USING [COVERING] INDEX ..." for an index walk
+            if words and words[0] == "SCAN":
+                table = words[2] if words[1] == "TABLE" else words[1]
+                if table in tables and scans.get(table) != "table":
+                    scans[table] = "index" if "INDEX" in words else "table"
+        return scans
+
+    if dialect == "mysql":
+        result = conn.execute(_explain("EXPLAIN", sql, params), params)
+        for r in (dict(zip(result.keys(), row)) for row in result):
+            # type ALL reads every row, type index every index entry
+            kind = {"ALL": "table", "index": "index"}.get(r.get("type"))
+            if kind and r.get("table") in tables and scans.get(r["table"]) != "table":
+                scans[r["table"]] = kind
+        return scans
+
+    if dialect == "postgresql":
+        plan = conn.execute(_explain("EXPLAIN (FORMAT JSON)", sql, params), params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return {t: k for t, k in _pg_scans(plan[0]["Plan"]).items() if t in tables}
+
+    raise ValueError(f"plan check unsupported for {dialect}")
+
+
+def missing_indexes(engine):
+    tables = set(inspect(engine).get_table_names())
+    return [
+        (table, columns, unique)
+        for table, columns, unique in schema.HOT_INDEXES
+        if table not in tables or schema.find_index(engine, table, columns, unique) is None
+    ]
+
+
+def check(engine):
+    """Print the plan check; returns the number of problems found"""
+    if engine.dialect.name not in PLAN_DIALECTS:
+        print(f"Plan check unsupported for {engine.dialect.name} "
+              f"(supported: {', '.join(PLAN_DIALECTS)})")
+        return 1
+
+    problems = 0
+    for table, columns, unique in missing_indexes(engine):
+        print(f"MISSING  {'unique key' if unique else 'index'} {table} ({', '.join(columns)})")
+        problems += 1
+
+    tables = set(inspect(engine).get_table_names())
+    with engine.connect() as conn:
+        city = conn.execute(text("SELECT name FROM weather_master LIMIT 1")).scalar() or "Delhi,IN"
+        registered = registered_queries(city, dialect=engine.dialect.name)
+        for source in unregistered_queries(registered):
+            print(f"UNREGISTERED  {source}: add it to registered_queries")
+            problems += 1
+
+        for _, label, sql, params in registered:
+            try:
+                scans = full_scans(conn, engine.dialect.name, sql, params, tables)
+            except DBAPIError as e:
+                print(f"ERROR    {label}: {e.orig}")
+                problems += 1
+                continue
+            allowed, why = INTENDED_FULL_READS.get(label, (set(), None))
+            unexpected = sorted(t for t in scans if t not in allowed)
+            if unexpected:
+                print(f"SCAN     {label}: "
+                      f"{', '.join(f'{scans[t]} scan of {t}' for t in unexpected)}")
+                problems += 1
+            elif scans:
+                print(f"full     {label}: "
+                      f"{', '.join(f'{t} ({scans[t]} scan)' for t in sorted(scans))} ({why})")
+            else:
+                print(f"ok       {label}")
+
+    print(f"\n{problems} problem(s)")
+    return problems
+
+
+# ================= MAIN =================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply schema migrations / check query plans")
+    parser.add_argument("--check", action="store_true", help="EXPLAIN every registered query")
+    parser.add_argument("--status", action="store_true", help="list applied migrations")
+    parser.add_argument("--db-url", default=None,
+                        help="database URL (defaults to the shared ml_model.db engine)")
+    args = parser.parse_args(argv)
+
+    engine = connect(args.db_url)
+
+    if args.status:
+        done = applied_versions(engine)
+        for version, description, _ in MIGRATIONS:
+            print(f"{'applied' if version in done else 'pending'}  {version}: {description}")
+        return 0
+    if args.check:
+        return 1 if check(engine) else 0
+
+    migrate(engine)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
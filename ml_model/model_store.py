@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import joblib
+
+# -------------------------------
+# ON-DISK MODEL STORE
+# -------------------------------
+# One uncompressed joblib file per (table, location, mode) so the forests
+# can be memory-mapped on load, plus a small JSON sidecar holding the data
+# watermark, which is read without touching the model file.
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+
+def _base_path(table, location, mode):
+    slug = re.sub(r"[^a-z0-9]+", "_", location.lower()).strip("_")
+    digest = hashlib.sha1(f"{table}/{location}".encode("utf-8")).hexdigest()[:8]
+    return os.path.join(MODEL_DIR, table, f"{slug}-{digest}-{mode}")
+
+
+def watermark(df):
+    """Identify the training data by its last datetime and row count"""
+    return {
+        "last_datetime": str(df["datetime"].iloc[-1]),
+        "rows": int(len(df))
+    }
+
+
+def load_meta(table, location, mode):
+    try:
+        with open(_base_path(table, location, mode) + ".json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def needs_refit(meta, mark, max_age_days=None):
+    """
+    Refit when nothing is stored or the data watermark moved. With
+    max_age_days set, a stored model younger than that is kept even if new
+    rows arrived, so locations refit on a fixed cadence.
+    """
+    if meta is None:
+        return True
+    if meta.get("watermark") == mark:
+        return False
+    if max_age_days is None:
+        return True
+
+    trained_at = datetime.fromisoformat(meta["trained_at"])
+    return (datetime.now() - trained_at).days >= max_age_days
+
+
+def load_models(table, location, mode, mmap_mode="r"):
+    """Return (temp_model, rain_model, fitted mode) or None if unreadable"""
+    try:
+        stored = joblib.load(_base_path(table, location, mode) + ".joblib", mmap_mode=mmap_mode)
+    except Exception as e:
+        print(f"Failed to load stored models for {location}:", e)
+        return None
+    return stored["temp_model"], stored["rain_model"], stored["mode"]
+
+
+def save_models(table, location, mode, temp_model, rain_model, fitted_mode, mark):
+    """
+    Write the models, then the sidecar, each through a temp file and an
+    atomic rename, so a reader never sees a watermark without its models.
+    """
+    base = _base_path(table, location, mode)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+
+    tmp = f"{base}.joblib.{os.getpid()}.tmp"
+    joblib.dump(
+        {"temp_model": temp_model, "rain_model": rain_model, "mode": fitted_mode},
+        tmp
+    )
+    os.replace(tmp, base + ".joblib")
+
+    meta = {
+        "location": location,
+        "table": table,
+        "mode": fitted_mode,
+        "watermark": mark,
+        "trained_at": datetime.now().isoformat(timespec="seconds")
+    }
+    tmp = f"{base}.json.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, base + ".json")
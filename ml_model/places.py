@@ -0,0 +1,14 @@
+# -------------------------------
+# PLACE NAMES
+# -------------------------------
+# Weather rows, festival place lists and user input all go through
+# normalize_place so they meet on the same "Title,IN" key.
+
+
+def normalize_place(name):
+    if not name:
+        return None
+    name = name.lower().strip()
+    if not name.endswith(",in"):
+        name += ",in"
+    return name.title().replace(",In", ",IN")
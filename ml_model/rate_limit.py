@@ -0,0 +1,62 @@
+import asyncio
+import random
+import threading
+import time
+
+# -------------------------------
+# TOKEN BUCKET
+# -------------------------------
+class TokenBucket:
+    """
+    Allow `rate` calls per second on average with bursts of up to
+    `capacity`; acquire() blocks until a token is free. Thread-safe.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token and return 0, or return the seconds until one is due"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                wait = self._take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+class AsyncTokenBucket(TokenBucket):
+    """TokenBucket for coroutines on one event loop; acquire() is awaited"""
+
+    async def acquire(self):
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+# -------------------------------
+# RETRIES
+# -------------------------------
+# Responses worth another attempt: rate limited or a server-side failure
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def backoff_seconds(attempt):
+    """Jittered wait before retrying failed attempt number `attempt` (from 0)"""
+    return random.uniform(0, 2 ** attempt)
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------------
+# RESULT CACHE
+# -------------------------------
+# In-process LRU with a TTL, optionally backed by a directory of pickles
+# shared between processes (e.g. several Streamlit workers). Callers put
+# the data generation into their keys, so a refresh makes old entries
+# unreachable; clear() frees them early.
+
+
+class ResultCache:
+    """
+    LRU cache of up to maxsize entries, each valid for ttl seconds.
+    With disk_dir set, misses fall back to (and puts write through to)
+    one pickle file per key in that directory.
+    """
+
+    def __init__(self, maxsize=256, ttl=900, disk_dir=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.pkl")
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, expires, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print("Ignoring unreadable result cache file:", e)
+            return None
+
+        if stored_key != key or expires < time.time():
+            return None
+        return expires, value
+
+    def _write_disk(self, key, expires, value):
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump((key, expires, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError as e:
+            print("Failed to write result cache file:", e)
+
+    def get(self, key):
+        """Cached value or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.disk_dir:
+            found = self._read_disk(key)
+            if found is not None:
+                with self._lock:
+                    self._store(key, *found)
+                    self.disk_hits += 1
+                return found[1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _store(self, key, expires, value):
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def put(self, key, value):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires, value)
+        if self.disk_dir:
+            self._write_disk(key, expires, value)
+
+    def clear(self):
+        """Drop the in-process entries (disk entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries)
+            }
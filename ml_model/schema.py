@@ -0,0 +1,184 @@
+# -------------------------------
+# DATABASE SCHEMA AND HOT-PATH INDEXES
+# -------------------------------
+# Table definitions for a fresh database and the indexes every hot query
+# relies on. Applied by ml_model.migrations; ensure_index is idempotent and
+# accepts an existing index (or unique / primary key) under any name as
+# long as it starts with the wanted columns.
+
+import pandas as pd
+from sqlalchemy import (
+    Column, Date, DateTime, Float, Integer, MetaData, String, Table, Text,
+    func, inspect, text
+)
+
+from ml_model.ingestion.mapping import DAY_FIELDS
+
+# MySQL can only index TEXT columns (what to_sql creates for strings) by prefix
+KEY_PREFIX_LENGTH = 100
+
+TEXT_DAY_FIELDS = {
+    "preciptype": Text, "conditions": String(100), "description": Text,
+    "icon": String(50), "stations": Text, "sunrise": String(32), "sunset": String(32)
+}
+
+metadata = MetaData()
+
+
+def weather_table(table):
+    """weather_master and weather_data share the ingestion column layout"""
+    return Table(
+        table, metadata,
+        Column("name", String(100), nullable=False),
+        Column("datetime", Date, nullable=False),
+        *[Column(f, TEXT_DAY_FIELDS.get(f, Float)) for f in DAY_FIELDS],
+        Column("source", String(32)),
+        Column("fetched_at", DateTime, server_default=func.now())
+    )
+
+
+WEATHER_MASTER = weather_table("weather_master")
+WEATHER_DATA = weather_table("weather_data")
+
+WEATHER_PREDICTIONS = Table(
+    "weather_predictions", metadata,
+    Column("name", String(100), nullable=False),
+    Column("base_date", Date),
+    Column("predicted_date", Date, nullable=False),
+    Column("pred_temp", Float),
+    Column("pred_rain_prob", Float),
+    Column("pred_rain_flag", Integer),
+    Column("humidity", Float),
+    Column("feelslike", Float),
+    Column("windspeed", Float),
+    Column("uvindex", Float),
+    Column("conditions", String(100)),
+    Column("description", String(255)),
+    Column("icon", String(50)),
+    Column("sunrise", String(32)),
+    Column("sunset", String(32))
+)
+
+FESTIVALS = Table(
+    "festivals", metadata,
+    Column("festival_name", String(200)),
+    Column("festival_date", Date),
+    Column("recommended_places", Text)
+)
+
+# The weather ranges refresh reads the history tables by day alone
+# (added by migration 3)
+DAY_INDEXES = [
+    ("weather_master", ("datetime",), False),
+    ("weather_data", ("datetime",), False)
+]
+
+# ...and looks for rows rewritten since its last load (migration 4)
+STAMP_INDEXES = [
+    ("weather_master", ("fetched_at",), False),
+    ("weather_data", ("fetched_at",), False)
+]
+
+# (table, columns, unique): what the hot queries filter on. The unique
+# keys are also what the weather and prediction upserts clash on.
+HOT_INDEXES = [
+    ("weather_master", ("name", "datetime"), True),
+    ("weather_data", ("name", "datetime"), True),
+    ("weather_predictions", ("name", "predicted_date"), True),
+    ("weather_predictions", ("predicted_date",), False),
+    ("festivals", ("festival_date",), False)
+] + DAY_INDEXES + STAMP_INDEXES
+
+# Which of several rows sharing a unique key is the newest one, kept when
+# the key is added to a table that predates it
+NEWEST_COLUMN = {
+    "weather_master": "fetched_at",
+    "weather_data": "fetched_at",
+    "weather_predictions": "base_date"
+}
+
+
+# ================= INDEXES =================
+def index_name(table, columns, unique=False):
+    return f"{'uq' if unique else 'ix'}_{table}_{'_'.join(columns)}"
+
+
+def find_index(engine, table, columns, unique=False):
+    """
+    Name of an index, unique constraint or primary key of `table` whose
+    leading columns are `columns` (exactly `columns` when unique), else None
+    """
+    columns = tuple(columns)
+    inspector = inspect(engine)
+
+    candidates = [
+        (i["name"], i["column_names"], bool(i.get("unique")))
+        for i in inspector.get_indexes(table)
+    ]
+    candidates += [
+        (c["name"], c["column_names"], True)
+        for c in inspector.get_unique_constraints(table)
+    ]
+    pk = inspector.get_pk_constraint(table)
+    if pk.get("constrained_columns"):
+        candidates.append((pk.get("name") or "PRIMARY", pk["constrained_columns"], True))
+
+    for name, names, is_unique in candidates:
+        names = tuple(names)
+        if unique and (not is_unique or names != columns):
+            continue
+        if names[:len(columns)] == columns:
+            return name
+    return None
+
+
+def drop_duplicate_keys(engine, table, columns, newest=None):
+    """
+    Keep one row per `columns` key, the one with the largest `newest`
+    value (NULL counts as oldest); returns the number of rows removed
+    """
+    cols = ", ".join(columns)
+    on = " AND ".join(f"t.{c} = d.{c}" for c in columns)
+    where = " AND ".join(f"{c} = :{c}" for c in columns)
+
+    with engine.begin() as conn:
+        dup = pd.read_sql(text(f"""
+            SELECT t.*
+            FROM {table} t
+            JOIN (
+                SELECT {cols} FROM {table} GROUP BY {cols} HAVING COUNT(*) > 1
+            ) d ON {on}
+        """), conn)
+        if dup.empty:
+            return 0
+
+        if newest in dup.columns:
+            dup = dup.sort_values(newest, na_position="first", kind="stable")
+        keep = dup.drop_duplicates(list(columns), keep="last")
+        conn.execute(text(f"DELETE FROM {table} WHERE {where}"), keep[list(columns)].to_dict("records"))
+        keep.to_sql(table, conn, if_exists="append", index=False)
+
+    removed = len(dup) - len(keep)
+    print(f"Removed {removed} duplicate rows from {table} (kept the newest per {cols})")
+    return removed
+
+
+def ensure_index(engine, table, columns, unique=False):
+    """Create the index unless `table` already has an equivalent one; True if created"""
+    if find_index(engine, table, columns, unique) is not None:
+        return False
+
+    if engine.dialect.name == "mysql":
+        types = {c["name"]: str(c["type"]).upper() for c in inspect(engine).get_columns(table)}
+        cols = ", ".join(
+            f"{c}({KEY_PREFIX_LENGTH})" if "TEXT" in types.get(c, "") else c
+            for c in columns
+        )
+    else:
+        cols = ", ".join(columns)
+
+    name = index_name(table, columns, unique)
+    print(f"Adding {'unique key' if unique else 'index'} {name} ({', '.join(columns)})")
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({cols})"))
+    return True
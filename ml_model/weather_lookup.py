@@ -0,0 +1,62 @@
+# Per-city queries of the weather tab.
+#
+# weather_master and weather_data are queried one at a time with the
+# predicate and a column projection applied, and the newest fetch wins.
+# A WHERE on a derived UNION ALL of both tables is not pushed down by
+# MySQL, which materializes both tables for every lookup; two queries on
+# a composite (name, datetime) index are two index seeks. The indexes are
+# created by ml_model.migrations.
+
+import pandas as pd
+from sqlalchemy import text
+
+LOOKUP_TABLES = ("weather_master", "weather_data")
+
+# What the weather tab shows, plus the column that picks the newest fetch
+LOOKUP_COLUMNS = ("name", "datetime", "temp", "conditions", "precip", "precipprob", "fetched_at")
+
+# Every stored prediction of a city (the 60-day window), one query per city
+FORECAST_WINDOW_SQL = text("""
+    SELECT *
+    FROM weather_predictions
+    WHERE name = :city
+    ORDER BY predicted_date
+""")
+
+TEMPERATURE_TREND_SQL = text("""
+    SELECT datetime, temp
+    FROM weather_master
+    WHERE name = :city
+    ORDER BY datetime DESC
+    LIMIT 7
+""")
+
+
+def lookup_sql(table, columns=LOOKUP_COLUMNS):
+    return text(f"""
+        SELECT {', '.join(columns)}
+        FROM {table}
+        WHERE name = :city
+          AND datetime = :dt
+        ORDER BY fetched_at DESC
+        LIMIT 1
+    """)
+
+
+def lookup_actual(engine, city, dt, columns=LOOKUP_COLUMNS):
+    """
+    Newest stored row of `city` on `dt` across the weather tables, as a
+    one-row DataFrame (empty if neither table has the day)
+    """
+    params = {"city": city, "dt": dt}
+    rows = []
+    with engine.connect() as conn:
+        for table in LOOKUP_TABLES:
+            row = conn.execute(lookup_sql(table, columns), params).first()
+            if row is not None:
+                rows.append(tuple(row))
+
+    # ORDER BY fetched_at DESC: NULLs last, weather_master first on a tie
+    at = columns.index("fetched_at")
+    rows.sort(key=lambda r: (r[at] is not None, r[at] or ""), reverse=True)
+    return pd.DataFrame(rows[:1], columns=list(columns))
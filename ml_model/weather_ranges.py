@@ -0,0 +1,376 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from ml_model.climatology import doys_between
+
+# -------------------------------
+# IN-MEMORY DATE-RANGE AGGREGATES
+# -------------------------------
+# Every weather source is loaded once into per-place cumulative sums over a
+# dense day axis (days since 1970 for daily tables, day of year for the
+# climatology). The mean temp / rain and the condition counts of any range
+# are then two column lookups for all places at once, instead of a scan
+# over the rows of the range.
+
+# Days before the last loaded one that are re-read on an incremental
+# refresh; the fetch scripts rewrite the current day. Older days rewritten
+# since the last load (backfill, replay) show up in changed_before through
+# the fetched_at the upsert stamps them with, and force a full reload.
+REFRESH_OVERLAP_DAYS = 7
+
+SOURCES = {
+    "history": {
+        "rows": """
+            SELECT name, datetime AS day, temp, conditions, precipprob AS rain_prob
+            FROM weather_master WHERE datetime >= :since
+            UNION ALL
+            SELECT name, datetime AS day, temp, conditions, precipprob AS rain_prob
+            FROM weather_data WHERE datetime >= :since
+        """,
+        "count_before": """
+            SELECT
+                (SELECT COUNT(*) FROM weather_master WHERE datetime < :since)
+                + (SELECT COUNT(*) FROM weather_data WHERE datetime < :since)
+        """,
+        "changed_before": """
+            SELECT
+                (SELECT COUNT(*) FROM weather_master
+                 WHERE fetched_at >= :stamp AND datetime < :since)
+                + (SELECT COUNT(*) FROM weather_data
+                   WHERE fetched_at >= :stamp AND datetime < :since)
+        """,
+        "stamp": """
+            SELECT MAX(stamp) FROM (
+                SELECT MAX(fetched_at) AS stamp FROM weather_master
+                UNION ALL
+                SELECT MAX(fetched_at) AS stamp FROM weather_data
+            ) t
+        """,
+        "incremental": True
+    },
+    # Rewritten as a whole by every forecast run, and small
+    "predictions": {
+        "rows": """
+            SELECT name, predicted_date AS day, pred_temp AS temp, conditions,
+                   pred_rain_prob AS rain_prob
+            FROM weather_predictions
+        """,
+        "incremental": False
+    },
+    # Day axis is the leap-calendar day of year of ml_model.climatology
+    "seasonal": {
+        "rows": """
+            SELECT name, doy AS day, temp_mean AS temp, rain_mean AS rain_prob
+            FROM weather_climatology
+        """,
+        "conditions": """
+            SELECT name, doy AS day, conditions, days AS n
+            FROM weather_climatology_conditions
+        """,
+        "incremental": False
+    }
+}
+
+FIELDS = ("rows", "temp", "temp_n", "rain", "rain_n")
+
+# :since for a full load (the smallest MySQL DATE)
+FULL_LOAD_SINCE = "1000-01-01"
+
+
+def day_numbers(values):
+    """Days since 1970-01-01 for dates, datetimes or date strings"""
+    return (
+        pd.to_datetime(pd.Series(values)).values
+        .astype("datetime64[D]").astype(np.int64)
+    )
+
+
+# ================= PREFIX SUMS =================
+class RangeSums:
+    """
+    Per-place prefix sums over an integer day axis: row counts, temp and
+    rain sums with their non-null counts, and counts per condition.
+    Column i holds the totals of every day before origin + i.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.conditions = []
+        self.origin = 0
+        self.sums = {f: np.zeros((0, 1)) for f in FIELDS}
+        self.cond = np.zeros((0, 0, 1), dtype=np.int32)
+
+    @property
+    def days(self):
+        return self.sums["rows"].shape[1] - 1
+
+    @property
+    def last_day(self):
+        return self.origin + self.days - 1
+
+    def copy(self):
+        """Independent copy, for updating while readers use the original"""
+        other = RangeSums()
+        other.names = list(self.names)
+        other.conditions = list(self.conditions)
+        other.origin = self.origin
+        other.sums = {f: arr.copy() for f, arr in self.sums.items()}
+        other.cond = self.cond.copy()
+        return other
+
+    def rows_before(self, day):
+        """Number of loaded rows dated before `day`"""
+        i = int(np.clip(day - self.origin, 0, self.days))
+        return int(self.sums["rows"][:, i].sum())
+
+    def update(self, rows, conds, since=None):
+        """
+        Replace every day from `since` on (all days when None) with the
+        given rows: rows has name, day, temp, rain_prob; conds has name,
+        day, conditions and a count n.
+        """
+        if since is None or not self.names:
+            self.__init__()
+            days = pd.concat([rows["day"], conds["day"]])
+            if days.empty:
+                return
+            self.origin = int(days.min())
+            since = self.origin
+        self._grow(rows, conds)
+
+        start = since - self.origin
+        width = self.days - start
+        if width <= 0:
+            return
+
+        name_pos = pd.Index(self.names)
+        places = len(self.names)
+
+        p = name_pos.get_indexer(rows["name"])
+        d = rows["day"].to_numpy() - since
+        flat = p * width + d
+        size = places * width
+        temp = rows["temp"].astype(float)
+        rain = rows["rain_prob"].astype(float)
+        daily = {
+            "rows": np.bincount(flat, minlength=size),
+            "temp": np.bincount(flat, weights=temp.fillna(0).to_numpy(), minlength=size),
+            "temp_n": np.bincount(flat, weights=temp.notna().to_numpy(), minlength=size),
+            "rain": np.bincount(flat, weights=rain.fillna(0).to_numpy(), minlength=size),
+            "rain_n": np.bincount(flat, weights=rain.notna().to_numpy(), minlength=size)
+        }
+        for f, values in daily.items():
+            arr = self.sums[f]
+            arr[:, start + 1:] = arr[:, start:start + 1] + np.cumsum(
+                values.reshape(places, width), axis=1
+            )
+
+        n_conds = len(self.conditions)
+        p = name_pos.get_indexer(conds["name"])
+        c = pd.Index(self.conditions).get_indexer(conds["conditions"])
+        d = conds["day"].to_numpy() - since
+        counts = np.bincount(
+            (p * n_conds + c) * width + d,
+            weights=conds["n"].to_numpy(),
+            minlength=places * n_conds * width
+        ).reshape(places, n_conds, width)
+        self.cond[:, :, start + 1:] = self.cond[:, :, start:start + 1] + np.cumsum(
+            counts, axis=2
+        ).astype(np.int32)
+
+    def _grow(self, rows, conds):
+        """Make room for new names, conditions and days (new cells are zero)"""
+        known = set(self.names)
+        new_names = sorted(set(rows["name"]).union(conds["name"]) - known)
+        known = set(self.conditions)
+        new_conds = sorted(set(conds["conditions"]) - known)
+
+        days = pd.concat([rows["day"], conds["day"]])
+        new_days = max(int(days.max()) - self.last_day, 0) if not days.empty else 0
+
+        if not (new_names or new_conds or new_days):
+            return
+
+        sums = {}
+        for f, arr in self.sums.items():
+            arr = np.pad(arr, ((0, len(new_names)), (0, new_days)))
+            if new_days:
+                # Days past the old end carry the old running totals
+                arr[:, -new_days:] = arr[:, -new_days - 1:-new_days]
+            sums[f] = arr
+
+        cond = np.pad(self.cond, ((0, len(new_names)), (0, len(new_conds)), (0, new_days)))
+        if new_days:
+            cond[:, :, -new_days:] = cond[:, :, -new_days - 1:-new_days]
+
+        # Names and arrays change together, never one without the other
+        self.sums, self.cond = sums, cond
+        self.names = self.names + new_names
+        self.conditions = self.conditions + new_conds
+
+    def aggregate(self, runs, names=None):
+        """
+        One row per place with rows in the inclusive day runs [(lo, hi)]:
+        name, avg_temp, avg_rain and the most frequent condition (ties
+        go to the smallest value), sorted by name
+        """
+        if names is None:
+            pos = np.arange(len(self.names))
+        else:
+            pos = pd.Index(self.names).get_indexer(list(names))
+            pos = pos[pos >= 0]
+
+        totals = {f: np.zeros(len(pos)) for f in FIELDS}
+        counts = np.zeros((len(pos), len(self.conditions)), dtype=np.int64)
+        for lo, hi in runs:
+            a = int(np.clip(lo - self.origin, 0, self.days))
+            b = int(np.clip(hi - self.origin + 1, 0, self.days))
+            if b <= a:
+                continue
+            for f in FIELDS:
+                totals[f] += self.sums[f][pos, b] - self.sums[f][pos, a]
+            counts += self.cond[pos, :, b] - self.cond[pos, :, a]
+
+        keep = totals["rows"] > 0
+        pos, counts = pos[keep], counts[keep]
+        totals = {f: v[keep] for f, v in totals.items()}
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_temp = np.where(totals["temp_n"] > 0, totals["temp"] / totals["temp_n"], np.nan)
+            avg_rain = np.where(totals["rain_n"] > 0, totals["rain"] / totals["rain_n"], np.nan)
+
+        order = np.argsort(self.conditions)
+        if len(order):
+            condition = np.asarray(self.conditions, dtype=object)[order][
+                counts[:, order].argmax(axis=1)
+            ]
+            condition[counts.sum(axis=1) == 0] = np.nan
+        else:
+            condition = np.full(len(pos), np.nan, dtype=object)
+
+        # Differences of running sums carry rounding noise from earlier
+        # days; trimming it keeps averages that land on a score threshold
+        # (e.g. exactly 18.0) on the same side as a direct AVG
+        return pd.DataFrame({
+            "name": np.asarray(self.names, dtype=object)[pos],
+            "avg_temp": np.round(avg_temp, 9),
+            "avg_rain": np.round(avg_rain, 9),
+            "condition": condition
+        }).sort_values("name", ignore_index=True)
+
+
+# ================= SOURCES =================
+class WeatherRanges:
+    """
+    Lazily loaded RangeSums per source. After a data generation change
+    each source is refreshed on its next use: history re-reads only the
+    last REFRESH_OVERLAP_DAYS and newer (everything if older rows changed),
+    the small prediction and climatology tables are reloaded whole.
+
+    A RangeSums handed out by sums() is never modified afterwards: a
+    refresh updates a copy and swaps it in, so readers aggregating outside
+    the lock keep a consistent snapshot.
+    """
+
+    def __init__(self):
+        self._sums = {}
+        # Newest fetched_at seen before each incremental load
+        self._stamps = {}
+        self._stale = set()
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._stale.update(self._sums)
+
+    def _load(self, engine, source):
+        spec = SOURCES[source]
+        sums = self._sums.get(source)
+        since = None
+        if sums is not None and spec["incremental"] and sums.names:
+            since = max(sums.last_day - REFRESH_OVERLAP_DAYS, sums.origin)
+            stamp = self._stamps.get(source)
+            params = {"since": _as_date(since), "stamp": stamp}
+            with engine.connect() as conn:
+                before = conn.execute(text(spec["count_before"]), params).scalar()
+                # Rows deleted before `since` change the count, rows
+                # rewritten there carry a newer fetched_at
+                changed = stamp is None or conn.execute(
+                    text(spec["changed_before"]), params
+                ).scalar()
+            if changed or int(before) != sums.rows_before(since):
+                since = None
+        if sums is None or since is None:
+            sums = RangeSums()
+        else:
+            sums = sums.copy()
+
+        started = time.perf_counter()
+        stamp = None
+        if spec["incremental"]:
+            # Read first: a write racing the load is seen by the next refresh
+            with engine.connect() as conn:
+                stamp = conn.execute(text(spec["stamp"])).scalar()
+        params = {"since": _as_date(since) if since is not None else FULL_LOAD_SINCE}
+        rows = pd.read_sql(text(spec["rows"]), engine, params=params)
+        if "conditions" in spec:
+            conds = pd.read_sql(text(spec["conditions"]), engine)
+        else:
+            conds = rows.dropna(subset=["conditions"])[["name", "day", "conditions"]].assign(n=1)
+
+        if source != "seasonal":
+            rows["day"] = day_numbers(rows["day"])
+            conds["day"] = day_numbers(conds["day"])
+        sums.update(rows, conds, since)
+
+        print(
+            f"Weather ranges: {source} {'refreshed' if since is not None else 'loaded'}, "
+            f"{len(rows)} rows in {time.perf_counter() - started:.2f}s"
+        )
+        self._sums[source] = sums
+        self._stamps[source] = stamp
+        self._stale.discard(source)
+        return sums
+
+    def sums(self, engine, source):
+        with self._lock:
+            if source not in self._sums or source in self._stale:
+                return self._load(engine, source)
+            return self._sums[source]
+
+    def aggregate(self, engine, source, start_date, end_date, names=None):
+        """
+        Per-place weather for [start_date, end_date] from one source, in the
+        shape of read_weather; None if the climatology rollup is missing
+        """
+        if source == "seasonal":
+            try:
+                sums = self.sums(engine, source)
+            except DBAPIError:
+                return None
+            agg = sums.aggregate(doy_runs(doys_between(start_date, end_date)), names)
+            return agg if not agg.empty else None
+
+        sums = self.sums(engine, source)
+        lo, hi = day_numbers([start_date, end_date])
+        return sums.aggregate([(lo, hi)], names)
+
+
+def _as_date(day):
+    return str(np.datetime64(int(day), "D"))
+
+
+def doy_runs(doys):
+    """Sorted days of year as inclusive (lo, hi) runs of consecutive days"""
+    runs = []
+    for doy in doys:
+        if runs and doy == runs[-1][1] + 1:
+            runs[-1][1] = doy
+        else:
+            runs.append([doy, doy])
+    return [tuple(r) for r in runs]
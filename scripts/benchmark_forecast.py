@@ -0,0 +1,117 @@
+# scripts/benchmark_forecast.py
+#
+# Wall-time comparison of the 60-day horizon inference modes on synthetic
+# history (no database needed):
+#   python scripts/benchmark_forecast.py
+
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml_model.random_forest import (
+    FEATURES, MAX_PREDICT_DAYS, fit_models, forecast_horizon
+)
+
+# ================= SYNTHETIC HISTORY =================
+def synthetic_history(days=3 * 365, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp(date.today()), periods=days, freq="D")
+    season = 8 * np.sin(2 * np.pi * (dates.dayofyear - 100) / 365.25)
+
+    df = pd.DataFrame({
+        "datetime": dates,
+        "temp": 24 + season + rng.normal(0, 1.5, days),
+        "feelslike": 25 + season,
+        "humidity": rng.uniform(30, 90, days),
+        "windspeed": rng.uniform(2, 25, days),
+        "cloudcover": rng.uniform(0, 100, days),
+        "uvindex": rng.integers(1, 11, days),
+        "precip": np.where(rng.random(days) < 0.3, rng.uniform(0.1, 20, days), 0.0),
+        "sunrise": "06:00:00",
+        "sunset": "18:30:00"
+    })
+    df["rain_flag"] = (df["precip"] > 0).astype(int)
+    df["temp_lag_1"] = df["temp"].shift(1)
+    df["temp_lag_7"] = df["temp"].shift(7)
+    df["month"] = df["datetime"].dt.month
+    df["dayofyear"] = df["datetime"].dt.dayofyear
+    return df.dropna()
+
+
+# ================= PREVIOUS LOOP =================
+def row_by_row(df, temp_model, rain_model, pred_dates):
+    """The pre-vectorization loop: one DataFrame and two predicts per day"""
+    last = df.iloc[-1]
+    current_temp = last["temp"]
+    temps, probs = [], []
+
+    for pred_date in pred_dates:
+        row = {
+            "temp_lag_1": current_temp,
+            "temp_lag_7": df.iloc[-7]["temp"] if len(df) >= 7 else current_temp,
+            "humidity": last["humidity"],
+            "windspeed": last["windspeed"],
+            "cloudcover": last["cloudcover"],
+            "uvindex": last["uvindex"],
+            "month": pred_date.month,
+            "dayofyear": pred_date.timetuple().tm_yday
+        }
+        X_next = pd.DataFrame([row])[FEATURES]
+
+        pred_temp = float(temp_model.predict(X_next)[0])
+        probs.append(float(rain_model.predict_proba(X_next)[0][1]))
+        temps.append(pred_temp)
+        current_temp = pred_temp
+
+    return np.array(temps), np.array(probs)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(repeat=3):
+    df = synthetic_history()
+    base_date = date.today()
+    pred_dates = [base_date + timedelta(days=d) for d in range(1, MAX_PREDICT_DAYS + 1)]
+
+    temp_model, rain_model, _ = fit_models(df, "recursive")
+    direct_temp, direct_rain, direct_mode = fit_models(df, "direct")
+
+    loop_s, (loop_t, loop_p) = timed(
+        lambda: row_by_row(df, temp_model, rain_model, pred_dates), repeat
+    )
+    rec_s, (rec_t, rec_p) = timed(
+        lambda: forecast_horizon(df, temp_model, rain_model, pred_dates, "recursive"),
+        repeat
+    )
+    dir_s, _ = timed(
+        lambda: forecast_horizon(df, direct_temp, direct_rain, pred_dates, direct_mode),
+        repeat
+    )
+
+    print(f"History rows: {len(df)}, horizon: {MAX_PREDICT_DAYS} days (best of {repeat})")
+    print(f"  row-by-row loop : {loop_s * 1000:8.1f} ms")
+    print(f"  recursive       : {rec_s * 1000:8.1f} ms  ({loop_s / rec_s:.1f}x)")
+    print(f"  {direct_mode:<16}: {dir_s * 1000:8.1f} ms  ({loop_s / dir_s:.1f}x)")
+    print(
+        "  recursive vs loop max abs diff: "
+        f"temp {np.abs(rec_t - loop_t).max():.2e}, rain {np.abs(rec_p - loop_p).max():.2e}"
+    )
+
+
+if __name__ == "__main__":
+    main()
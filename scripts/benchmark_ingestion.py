@@ -0,0 +1,125 @@
+# scripts/benchmark_ingestion.py
+#
+# Throughput of the ingestion pipeline on synthetic Visual Crossing
+# responses (no network, in-memory SQLite): the previous per-place dict +
+# DataFrame + to_sql path against parse -> map -> batch -> write, checked
+# to store identical tables:
+#   python scripts/benchmark_ingestion.py [n_places] [n_days]
+
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml_model.ingestion.mapping import COLUMNS, DAY_FIELDS, JSON_FIELDS
+from ml_model.ingestion.pipeline import map_rows, parse_days, run_pipeline
+from ml_model.schema import ensure_index
+
+CONDITIONS = ["Clear", "Partially cloudy", "Rain, Overcast", "Overcast"]
+
+
+# ================= SYNTHETIC INPUT =================
+def synthetic_responses(n_places, n_days, seed=5):
+    rng = np.random.default_rng(seed)
+    start = date(2024, 1, 1)
+    responses = []
+    for i in range(n_places):
+        days = []
+        for d in range(n_days):
+            day = {f: round(float(v), 1) for f, v in zip(DAY_FIELDS, rng.uniform(0, 40, len(DAY_FIELDS)))}
+            day["datetime"] = (start + timedelta(days=d)).isoformat()
+            day["conditions"] = str(rng.choice(CONDITIONS))
+            day["description"] = "Synthetic day"
+            day["icon"] = "clear-day"
+            day["preciptype"] = ["rain"] if rng.random() < 0.3 else None
+            day["stations"] = ["VIDP", "42182099999"]
+            day["sunrise"], day["sunset"] = "06:12:00", "18:03:00"
+            del day["snowdepth"]     # fields the API leaves out now and then
+            days.append(day)
+        responses.append((f"Place {i:03d},IN", {"days": days}))
+    return responses
+
+
+# ================= PREVIOUS PATH =================
+def g(d, k):
+    return d.get(k)
+
+
+def to_json(v):
+    return json.dumps(v) if isinstance(v, (list, dict)) else v
+
+
+def legacy_store(engine, table, responses):
+    """The previous scripts: a dict per day, a DataFrame and a to_sql per place"""
+    for place, data in responses:
+        rows = []
+        for day in data["days"]:
+            row = {"name": place, "datetime": day["datetime"]}
+            for field in DAY_FIELDS:
+                value = g(day, field)
+                row[field] = to_json(value) if field in JSON_FIELDS else value
+            row["source"] = "visualcrossing"
+            rows.append(row)
+        df = pd.DataFrame(rows)
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE name = :name"), {"name": place}
+            )
+        df.to_sql(table, engine, if_exists="append", index=False)
+
+
+def read_table(engine, table):
+    return pd.read_sql(
+        text(f"SELECT {', '.join(COLUMNS)} FROM {table} ORDER BY name, datetime"), engine
+    )
+
+
+def main(n_places=40, n_days=365):
+    responses = synthetic_responses(n_places, n_days)
+    n_rows = n_places * n_days
+    print(f"{n_places} places x {n_days} days = {n_rows} rows")
+
+    started = time.perf_counter()
+    for _ in map_rows(parse_days(responses)):
+        pass
+    map_s = time.perf_counter() - started
+
+    engine = create_engine("sqlite://", future=True)
+    # Legacy path needs an existing table for its DELETE; the pipeline
+    # needs the unique key and fetched_at a migrated table has
+    sample = pd.DataFrame.from_records(list(map_rows(parse_days(responses[:1]))), columns=COLUMNS)
+    sample.head(0).to_sql("legacy", engine, index=False)
+    sample.head(0).assign(fetched_at=pd.Timestamp.now()).to_sql("pipeline", engine, index=False)
+    ensure_index(engine, "pipeline", ("name", "datetime"), unique=True)
+
+    started = time.perf_counter()
+    legacy_store(engine, "legacy", responses)
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    run_pipeline(engine, "pipeline", responses)
+    pipeline_s = time.perf_counter() - started
+
+    pd.testing.assert_frame_equal(
+        read_table(engine, "pipeline"), read_table(engine, "legacy"), check_dtype=False
+    )
+    print(
+        f"  map only         : {map_s:6.2f}s ({n_rows / map_s:8.0f} rows/s)\n"
+        f"  dict+to_sql      : {legacy_s:6.2f}s ({n_rows / legacy_s:8.0f} rows/s)\n"
+        f"  pipeline         : {pipeline_s:6.2f}s ({n_rows / pipeline_s:8.0f} rows/s, "
+        f"{legacy_s / pipeline_s:.1f}x), tables identical"
+    )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
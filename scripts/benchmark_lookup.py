@@ -0,0 +1,143 @@
+# scripts/benchmark_lookup.py
+#
+# Latency of the weather tab's actual-weather lookup on large synthetic
+# weather tables (no network, SQLite file in a temp dir): the previous
+# SELECT * over a UNION ALL of both tables against the per-table projected
+# lookup on (name, datetime) indexes, checked to return the same rows:
+#   python scripts/benchmark_lookup.py [n_places] [n_days] [n_lookups]
+#
+# SQLite pushes the WHERE into the UNION ALL, which MySQL does not, so the
+# "old query, indexed" line is a lower bound of what MySQL gets from the
+# indexes alone.
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml_model.ingestion.mapping import DAY_FIELDS
+from ml_model.schema import ensure_index
+from ml_model.weather_lookup import LOOKUP_COLUMNS, LOOKUP_TABLES, lookup_actual
+
+CONDITIONS = ["Clear", "Partially cloudy", "Rain, Overcast", "Overcast"]
+START = date(2023, 1, 1)
+
+UNION_SQL = text("""
+    SELECT *
+    FROM (
+        SELECT * FROM weather_master
+        UNION ALL
+        SELECT * FROM weather_data
+    ) t
+    WHERE name = :city
+      AND datetime = :dt
+    ORDER BY fetched_at DESC
+    LIMIT 1
+""")
+
+
+# ================= SYNTHETIC TABLES =================
+def synthetic_table(names, n_days, fetched, rng):
+    n = len(names) * n_days
+    df = pd.DataFrame(
+        rng.uniform(0, 40, (n, len(DAY_FIELDS))).round(1), columns=DAY_FIELDS
+    )
+    df.insert(0, "name", np.repeat(names, n_days))
+    df.insert(1, "datetime", np.tile(
+        [(START + timedelta(days=d)).isoformat() for d in range(n_days)], len(names)
+    ))
+    df["conditions"] = rng.choice(CONDITIONS, n)
+    for field in ("preciptype", "description", "icon", "stations", "sunrise", "sunset"):
+        df[field] = "x"
+    df["source"] = "visualcrossing"
+    df["fetched_at"] = fetched
+    return df
+
+
+def build(path, n_places, n_days, seed=11):
+    rng = np.random.default_rng(seed)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    # Cities also show up as places, fetched later: the lookup has to pick the newest
+    cities = [f"City {i:02d},IN" for i in range(10)]
+    places = [f"Place {i:03d},IN" for i in range(n_places)] + cities[:5]
+    synthetic_table(cities, n_days, "2025-01-01 00:00:00", rng).to_sql(
+        "weather_master", engine, index=False, chunksize=5000
+    )
+    synthetic_table(places, n_days, "2025-06-01 00:00:00", rng).to_sql(
+        "weather_data", engine, index=False, chunksize=5000
+    )
+    return engine, cities + places
+
+
+# ================= TIMING =================
+def latencies(fn, keys):
+    times = []
+    for city, dt in keys:
+        started = time.perf_counter()
+        fn(city, dt)
+        times.append(time.perf_counter() - started)
+    return np.array(times) * 1000
+
+
+def report(label, ms):
+    print(
+        f"  {label:<22}: p50 {np.percentile(ms, 50):7.2f} ms   "
+        f"p99 {np.percentile(ms, 99):7.2f} ms   max {ms.max():7.2f} ms"
+    )
+
+
+def main(n_places=200, n_days=3 * 365, n_lookups=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        engine, names = build(os.path.join(tmp, "lookup.db"), n_places, n_days)
+        with engine.connect() as conn:
+            rows = sum(conn.execute(text(f"SELECT COUNT(*) FROM {t}")).scalar() for t in LOOKUP_TABLES)
+        print(f"{rows} rows in {LOOKUP_TABLES} ({time.perf_counter() - started:.1f}s to build)")
+
+        rng = np.random.default_rng(3)
+        keys = [
+            (str(rng.choice(names)), START + timedelta(days=int(rng.integers(0, n_days + 30))))
+            for _ in range(n_lookups)
+        ]
+
+        def old(city, dt):
+            return pd.read_sql(UNION_SQL, engine, params={"city": city, "dt": dt.isoformat()})
+
+        def new(city, dt):
+            return lookup_actual(engine, city, dt.isoformat())
+
+        # Unindexed tables only get a few lookups: each one scans both tables
+        old_ms = latencies(old, keys[:max(20, n_lookups // 10)])
+        for table in LOOKUP_TABLES:
+            ensure_index(engine, table, ("name", "datetime"))
+        indexed_ms = latencies(old, keys)
+        new_ms = latencies(new, keys)
+
+        for city, dt in keys:
+            a, b = old(city, dt), new(city, dt)
+            assert len(a) == len(b)
+            if len(a):
+                assert tuple(a.iloc[0][list(LOOKUP_COLUMNS)]) == tuple(b.iloc[0]), (city, dt)
+
+        report("old query, no index", old_ms)
+        report("old query, indexed", indexed_ms)
+        report("lookup layer, indexed", new_ms)
+        print(
+            f"  p99 {np.percentile(old_ms, 99) / np.percentile(new_ms, 99):.0f}x lower "
+            f"than before, same rows for {len(keys)} lookups"
+        )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
@@ -0,0 +1,142 @@
+# scripts/benchmark_ranges.py
+#
+# Regression check and timing for the weather ranges prefix sums on a
+# synthetic history table (no network, SQLite file in a temp dir): after
+# the first load, a new day, an old day rewritten in place (as backfill
+# and replay do) and a deleted old row, the per-place aggregates must
+# match a pandas aggregation of the table itself:
+#   python scripts/benchmark_ranges.py [n_places] [n_days]
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml_model.ingestion.writer import upsert_rows
+from ml_model.migrations import migrate
+from ml_model.weather_ranges import FULL_LOAD_SINCE, SOURCES, WeatherRanges
+
+CONDITIONS = ["Clear", "Partially cloudy", "Rain, Overcast", "Overcast"]
+COLUMNS = ("name", "datetime", "temp", "conditions", "precipprob", "fetched_at")
+START = date(2023, 1, 1)
+
+
+# ================= SYNTHETIC TABLE =================
+def synthetic_rows(places, days, rng):
+    """One row per place and day, fetched the day after"""
+    rows = []
+    for day in days:
+        fetched = datetime.combine(day + timedelta(days=1), datetime.min.time())
+        for name in places:
+            rows.append((
+                name, day.isoformat(), round(float(rng.uniform(0, 40)), 1),
+                str(rng.choice(CONDITIONS)), float(rng.choice([0.0, 0.1, 0.5, 0.9])),
+                fetched.isoformat(sep=" ")
+            ))
+    return rows
+
+
+def build(path, n_places, n_days, seed=11):
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate(engine)
+    rng = np.random.default_rng(seed)
+    places = [f"Place {i:03d},IN" for i in range(n_places)]
+    days = [START + timedelta(days=d) for d in range(n_days)]
+    # Cities come from weather_master, places from weather_data
+    upsert_rows(engine, "weather_master", COLUMNS, synthetic_rows(places[:10], days, rng))
+    upsert_rows(engine, "weather_data", COLUMNS, synthetic_rows(places[10:], days, rng))
+    return engine, places, days
+
+
+# ================= EXPECTED =================
+def expected(engine, start, end):
+    """What RangeSums.aggregate should return, straight from the rows"""
+    rows = pd.read_sql(
+        text(SOURCES["history"]["rows"]), engine, params={"since": FULL_LOAD_SINCE}
+    )
+    day = pd.to_datetime(rows["day"])
+    rows = rows[(day >= pd.Timestamp(start)) & (day <= pd.Timestamp(end))]
+    agg = rows.groupby("name").agg(avg_temp=("temp", "mean"), avg_rain=("rain_prob", "mean"))
+    # Most frequent condition, ties to the smallest value
+    counts = rows.groupby(["name", "conditions"]).size().reset_index(name="n")
+    counts = counts.sort_values(["name", "n", "conditions"], ascending=[True, False, True])
+    agg["condition"] = counts.drop_duplicates("name").set_index("name")["conditions"]
+    return agg.reset_index()
+
+
+def check(engine, ranges, windows, step):
+    """Refresh and compare every window; returns the refresh seconds and its log"""
+    ranges.invalidate()
+    log = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        ranges.sums(engine, "history")
+    elapsed = time.perf_counter() - started
+
+    for start, end in windows:
+        got = ranges.aggregate(engine, "history", start, end)
+        pd.testing.assert_frame_equal(
+            got, expected(engine, start, end), check_dtype=False, rtol=1e-9,
+            obj=f"{step}, {start} to {end}"
+        )
+    print(f"  {step:<22}: {elapsed * 1000:7.1f} ms, {log.getvalue().strip()}")
+    return elapsed, log.getvalue()
+
+
+def main(n_places=100, n_days=2 * 365):
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine, places, days = build(os.path.join(tmp, "ranges.db"), n_places, n_days)
+        print(f"{n_places * n_days} history rows, {n_places} places x {n_days} days")
+
+        last = days[-1]
+        old = last - timedelta(days=100)
+        windows = [
+            (days[0], last), (old - timedelta(days=10), old + timedelta(days=10)),
+            (old, old), (last - timedelta(days=3), last + timedelta(days=1))
+        ]
+        ranges = WeatherRanges()
+        rng = np.random.default_rng(5)
+
+        check(engine, ranges, windows, "first load")
+
+        # The daily fetch: a new day, re-read incrementally
+        with contextlib.redirect_stdout(io.StringIO()):
+            upsert_rows(engine, "weather_data", COLUMNS[:-1], [
+                row[:-1] for row in synthetic_rows(places[10:], [last + timedelta(days=1)], rng)
+            ])
+        _, log = check(engine, ranges, windows, "new day")
+        assert "refreshed" in log, log
+
+        # A backfill rewriting an old day in place: same row count
+        with contextlib.redirect_stdout(io.StringIO()):
+            upsert_rows(engine, "weather_data", COLUMNS[:-1], [
+                (name, old.isoformat(), 45.0, "Snow", 1.0) for name in places[10:20]
+            ])
+        check(engine, ranges, windows, "old day rewritten")
+
+        with engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM weather_master WHERE name = :name AND datetime = :day"),
+                {"name": places[0], "day": old.isoformat()}
+            )
+        check(engine, ranges, windows, "old row deleted")
+        print(f"  prefix sums match the table after every change ({len(windows)} windows)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
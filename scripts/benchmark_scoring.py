@@ -0,0 +1,168 @@
+# scripts/benchmark_scoring.py
+#
+# Regression check and timing for the columnar scoring in recommend_travel:
+# the previous iterrows loop and score_places() must produce the same top
+# rows on synthetic places (no database needed):
+#   python scripts/benchmark_scoring.py [n_places]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml_model.travel_recommendation_calendar import (
+    FESTIVAL_WEIGHT, TOP_K, calculate_weather_score, format_hours,
+    score_places, travel_time_hours, travel_time_score
+)
+
+TRAVEL_TYPES = ["Solo", "Family", "Friends", "Honeymoon"]
+CONDITIONS = ["Clear", "Cloudy", "Rain", "Partially cloudy", "Overcast"]
+
+
+# ================= SYNTHETIC INPUT =================
+def synthetic_places(n, seed=11):
+    rng = np.random.default_rng(seed)
+    places = [f"Place {i:05d},IN" for i in range(n)]
+    agg = pd.DataFrame({
+        "name": places,
+        # Whole degrees and coarse rain steps give plenty of score ties
+        "avg_temp": rng.integers(5, 40, n).astype(float),
+        "avg_rain": rng.choice([0.0, 0.1, 0.2, 0.3, 0.5, 0.7, np.nan], n),
+        "condition": rng.choice(CONDITIONS, n)
+    })
+    distances = np.round(rng.uniform(5, 2500, n), 1)
+    distances[rng.random(n) < 0.02] = np.nan
+
+    festival_map = {
+        p: [f"Festival {i}"] for i, p in enumerate(rng.choice(places, n // 50, replace=False))
+    }
+    return agg, places, distances, festival_map
+
+
+# ================= PREVIOUS LOOP =================
+def row_loop(agg, places, distances, festival_map, travel_type,
+             transport_mode, max_distance_km):
+    """
+    The previous iterrows scoring, sorted stably so ties keep place order;
+    distances is None when there is no current city
+    """
+    results = []
+
+    for pos, (_, r) in enumerate(agg.iterrows()):
+        place = places[pos]
+        score = calculate_weather_score(r.avg_temp, r.condition, r.avg_rain)
+
+        dist_km = None
+        hours = None
+
+        if distances is not None:
+            dist_km = float(distances[pos])
+            if np.isnan(dist_km):
+                continue
+            if max_distance_km and dist_km > max_distance_km:
+                continue
+
+            hours = travel_time_hours(dist_km, transport_mode)
+            score += travel_time_score(hours)
+
+        has_festival = place in festival_map
+        low_rain = (r.avg_rain is not None and r.avg_rain <= 0.2)
+        pleasant_temp = (18 <= r.avg_temp <= 28)
+        clear_weather = (r.condition in ("Clear", "Cloudy"))
+        warm_place = (r.avg_temp >= 25)
+
+        if travel_type == "Family":
+            if pleasant_temp:
+                score += 10
+            if hours is not None and hours <= 6:
+                score += 10
+        elif travel_type == "Honeymoon":
+            if has_festival:
+                score += 20
+            if clear_weather:
+                score += 15
+        elif travel_type == "Friends":
+            if warm_place:
+                score += 15
+            if has_festival:
+                score += 10
+        elif travel_type == "Solo":
+            if low_rain:
+                score += 8
+            if pleasant_temp:
+                score += 6
+
+        if has_festival:
+            score += FESTIVAL_WEIGHT
+
+        reasons = []
+        if pleasant_temp:
+            reasons.append("Pleasant temperature")
+        if low_rain:
+            reasons.append("Low chance of rain")
+        if hours is not None:
+            if hours <= 3:
+                reasons.append(f"Short travel time by {transport_mode}")
+            elif hours <= 6:
+                reasons.append(f"Moderate travel time by {transport_mode}")
+            else:
+                reasons.append(f"Long journey by {transport_mode}")
+        if has_festival:
+            reasons.append("Festival: " + ", ".join(festival_map[place]))
+
+        results.append({
+            "Place": place,
+            # The previous loop raised on a missing distance; score_places gives NaN
+            "Distance (km)": round(dist_km, 1) if dist_km is not None else np.nan,
+            "Travel Time": format_hours(hours),
+            "Avg Temp (°C)": round(r.avg_temp, 1),
+            "Condition": r.condition,
+            "Avg Rain": round(r.avg_rain, 3) if r.avg_rain is not None else None,
+            "Festival": ", ".join(festival_map.get(place, [])),
+            "Score": round(score, 2),
+            "Why recommended?": ", ".join(reasons)
+        })
+
+    return pd.DataFrame(results).sort_values("Score", ascending=False, kind="stable").head(TOP_K)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(n_places=10000, repeat=3):
+    agg, places, distances, festival_map = synthetic_places(n_places)
+    print(f"{n_places} places, top {TOP_K} (best of {repeat})")
+
+    for travel_type in TRAVEL_TYPES:
+        # No current city: no distances, so no travel time score or reasons
+        for transport_mode, max_km, dists in (("Car", 1000, distances),
+                                              ("Flight", None, distances),
+                                              ("Car", None, None)):
+            args = (agg, places, dists, festival_map, travel_type, transport_mode, max_km)
+
+            loop_s, expected = timed(lambda: row_loop(*args), repeat)
+            cols_s, got = timed(lambda: score_places(*args), repeat)
+
+            pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+            print(
+                f"  {travel_type:<9} {transport_mode if dists is not None else 'no city':<7} "
+                f"max={max_km!s:<5}: "
+                f"loop {loop_s * 1000:7.1f} ms, columnar {cols_s * 1000:6.1f} ms "
+                f"({loop_s / cols_s:.0f}x), rankings identical"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)